@@ -8,18 +8,37 @@ CustomMavLink - 基于Python的无人机管理系统
 主要模块:
 - airplane_owl02: 无人机对象类
 - airplane_manager_owl02: 无人机管理类  
-- main: 基础协议处理
+- custom_protocol_packet: 基础协议处理
 - owl02: OWL02协议实现
 """
 from version import __version__, __author__, __email__, __description__
 
-# 导入主要类和函数
-try:
-    from owl2.airplane_manager_owl02 import AirplaneManagerOwl02, create_manager_with_serial, create_manager
-    from owl2.airplane_owl02 import AirplaneOwl02
-except ImportError:
-    # 如果导入失败，可能是因为依赖未安装
-    pass
+import importlib
+
+# 主要类和函数按需导入（PEP 562），仅读取版本信息时无需加载串口与MavLink依赖
+_LAZY = {
+    'AirplaneOwl02': ('owl2.airplane_owl02', 'AirplaneOwl02'),
+    'AirplaneManagerOwl02': ('owl2.airplane_manager_owl02', 'AirplaneManagerOwl02'),
+    'create_manager': ('owl2.airplane_manager_owl02', 'create_manager'),
+    'create_manager_with_serial': ('owl2.airplane_manager_owl02', 'create_manager_with_serial'),
+    'wrap_packet': ('owl2.custom_protocol_packet', 'wrap_packet'),
+    'calculate_checksum': ('owl2.custom_protocol_packet', 'calculate_checksum'),
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module_name, attr = _LAZY[name]
+        value = getattr(importlib.import_module(module_name), attr)
+        # 缓存到模块全局，后续访问不再经过 __getattr__
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     '__version__',
@@ -30,4 +49,6 @@ __all__ = [
     'AirplaneManagerOwl02',
     'create_manager',
     'create_manager_with_serial',
+    'wrap_packet',
+    'calculate_checksum',
 ]
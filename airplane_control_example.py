@@ -2,13 +2,26 @@
 无人机管理系统实际使用示例
 """
 import asyncio
+import concurrent.futures
 import time
 import logging
 import signal
 import sys
+import threading
 from airplane_manager_owl02 import AirplaneManagerOwl02, create_manager_with_serial, create_manager
 from airplane_owl02 import AirplaneOwl02
 
+# 可选：非Windows平台使用uvloop作为事件循环（基于libuv，调度开销更低）
+try:
+    if sys.platform == 'win32':
+        raise ImportError
+    import uvloop
+except ImportError:
+    uvloop = None
+
+if uvloop is not None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -54,87 +67,95 @@ class AirplaneControlSystem:
         """监控所有无人机状态"""
         while self.is_running:
             try:
-                stats = self.manager.get_statistics()
-                
-                if stats['airplane_count'] > 0:
-                    logger.info(f"Monitoring {stats['airplane_count']} airplanes:")
-                    
-                    for device_id, airplane_stats in stats['airplanes'].items():
-                        logger.info(f"  Airplane {device_id}: "
-                                  f"Armed={airplane_stats['is_armed']}, "
-                                  f"Mode={airplane_stats['fly_mode']}, "
-                                  f"Landed={airplane_stats['is_landed']}, "
-                                  f"GPS=({airplane_stats['gps_position']['lat']:.6f}, "
-                                  f"{airplane_stats['gps_position']['lon']:.6f}, "
-                                  f"{airplane_stats['gps_position']['alt']:.2f}m)")
+                stats = self.manager.get_statistics_fast()
+                count = stats['count']
+
+                # 日志未启用INFO时跳过逐架格式化
+                if count > 0 and logger.isEnabledFor(logging.INFO):
+                    logger.info("Monitoring %d airplanes:", count)
+
+                    device_ids = stats['device_ids']
+                    is_armed = stats['is_armed']
+                    fly_mode = stats['fly_mode']
+                    is_landed = stats['is_landed']
+                    lat = stats['lat']
+                    lon = stats['lon']
+                    alt = stats['alt']
+                    for i in range(count):
+                        logger.info("  Airplane %d: Armed=%s, Mode=%s, Landed=%s, GPS=(%.6f, %.6f, %.2fm)",
+                                    device_ids[i], bool(is_armed[i]), fly_mode[i], is_landed[i],
+                                    lat[i], lon[i], alt[i])
                 else:
                     logger.info("No airplanes connected")
                     
                 await asyncio.sleep(5)  # 每5秒监控一次
                 
             except Exception as e:
-                logger.error(f"Error in monitoring: {e}")
+                logger.error("Error in monitoring: %s", e)
                 await asyncio.sleep(1)
                 
+    async def _wait_command(self, future, timeout: float) -> bool:
+        """等待命令应答（控制方法在异步模式下返回Future），超时返回False"""
+        if future is None or isinstance(future, bool):
+            return bool(future)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            return False
+
     async def control_airplane_example(self, device_id: int):
-        """控制无人机示例"""
+        """控制无人机示例（每一步等待无人机应答，而非固定延时）"""
         try:
             # 获取无人机对象
-            airplane = await self.manager.get_airplane(device_id)
-            logger.info(f"Controlling airplane {device_id}")
+            airplane = self.manager.get_airplane(device_id)
+            logger.info("Controlling airplane %d", device_id)
             
             # 检查初始状态
             state = airplane.get_state()
-            logger.info(f"Initial state: armed={state.is_armed}, mode={state.fly_mode}")
+            logger.info("Initial state: armed=%s, mode=%s", state.is_armed, state.fly_mode)
             
             # 控制序列示例
             logger.info("Step 1: Requesting autopilot version...")
-            await airplane.trigger_get_autopilot_version()
-            await asyncio.sleep(1)
+            airplane.trigger_get_autopilot_version()
             
             logger.info("Step 2: Arming the airplane...")
-            await airplane.arm()
-            await asyncio.sleep(2)
+            if not await self._wait_command(airplane.arm(), 3.0):
+                logger.warning("Airplane %d did not acknowledge arm", device_id)
             
             logger.info("Step 3: Takeoff to 10 meters...")
-            await airplane.takeoff(10.0)
-            await asyncio.sleep(5)
+            if not await self._wait_command(airplane.takeoff(10.0), 10.0):
+                logger.warning("Airplane %d did not acknowledge takeoff", device_id)
             
             logger.info("Step 4: Hold position for 10 seconds...")
             await asyncio.sleep(10)
             
             logger.info("Step 5: Return to launch...")
-            await airplane.return_to_launch()
-            await asyncio.sleep(5)
+            if not await self._wait_command(airplane.return_to_launch(), 20.0):
+                logger.warning("Airplane %d did not acknowledge return to launch", device_id)
             
             logger.info("Step 6: Landing...")
-            await airplane.land()
-            await asyncio.sleep(3)
+            if not await self._wait_command(airplane.land(), 15.0):
+                logger.warning("Airplane %d did not acknowledge land", device_id)
             
             logger.info("Step 7: Disarming...")
-            await airplane.disarm()
+            await self._wait_command(airplane.disarm(), 3.0)
             
-            logger.info(f"Control sequence completed for airplane {device_id}")
+            logger.info("Control sequence completed for airplane %d", device_id)
             
         except Exception as e:
-            logger.error(f"Error controlling airplane {device_id}: {e}")
+            logger.error("Error controlling airplane %d: %s", device_id, e)
             
     async def simulate_multiple_airplanes(self):
         """模拟多个无人机操作"""
-        tasks = []
-        
-        # 创建多个无人机的控制任务
-        for device_id in [1, 2, 3]:
-            task = asyncio.create_task(self.control_airplane_example(device_id))
-            tasks.append(task)
-            # 错开启动时间
-            await asyncio.sleep(2)
-            
+        # 各无人机设备ID独立，发送帧由管理器的发送线程排队写出，可同时启动
+        tasks = [asyncio.create_task(self.control_airplane_example(device_id))
+                 for device_id in (1, 2, 3)]
+
         # 等待所有任务完成
         await asyncio.gather(*tasks, return_exceptions=True)
         
-    def run_interactive_mode(self):
-        """交互式模式"""
+    async def run_interactive_mode(self):
+        """交互式模式（与监控任务并发运行）"""
         logger.info("进入交互式模式，输入命令控制无人机")
         logger.info("可用命令:")
         logger.info("  list - 列出所有无人机")
@@ -145,10 +166,38 @@ class AirplaneControlSystem:
         logger.info("  land <id> - 降落")
         logger.info("  rtl <id> - 返航")
         logger.info("  quit - 退出")
-        
+
+        # 监控任务与交互输入并发运行，退出交互后取消监控
+        monitor_task = asyncio.create_task(self.monitor_airplanes())
+        try:
+            await self._interactive_loop()
+        finally:
+            monitor_task.cancel()
+            await asyncio.gather(monitor_task, return_exceptions=True)
+
+    @staticmethod
+    async def _read_line(prompt: str) -> str:
+        """在守护线程中读取一行输入，避免阻塞事件循环
+
+        不使用默认线程池：asyncio.run 退出时会等待线程池中阻塞的 input() 返回，Ctrl-C 后需再按回车才能退出
+        """
+        future = concurrent.futures.Future()
+
+        def reader():
+            try:
+                future.set_result(input(prompt))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=reader, daemon=True).start()
+        return await asyncio.wrap_future(future)
+
+    async def _interactive_loop(self):
+        """交互式命令循环"""
         while self.is_running:
             try:
-                command = input("\n请输入命令: ").strip().split()
+                line = await self._read_line("\n请输入命令: ")
+                command = line.strip().split()
                 if not command:
                     continue
                     
@@ -169,69 +218,85 @@ class AirplaneControlSystem:
                     
                 elif cmd == 'arm' and len(command) > 1:
                     device_id = int(command[1])
-                    asyncio.run(self._arm_airplane(device_id))
+                    await self._arm_airplane(device_id)
                     
                 elif cmd == 'disarm' and len(command) > 1:
                     device_id = int(command[1])
-                    asyncio.run(self._disarm_airplane(device_id))
+                    await self._disarm_airplane(device_id)
                     
                 elif cmd == 'takeoff' and len(command) > 2:
                     device_id = int(command[1])
                     altitude = float(command[2])
-                    asyncio.run(self._takeoff_airplane(device_id, altitude))
+                    await self._takeoff_airplane(device_id, altitude)
                     
                 elif cmd == 'land' and len(command) > 1:
                     device_id = int(command[1])
-                    asyncio.run(self._land_airplane(device_id))
+                    await self._land_airplane(device_id)
                     
                 elif cmd == 'rtl' and len(command) > 1:
                     device_id = int(command[1])
-                    asyncio.run(self._rtl_airplane(device_id))
+                    await self._rtl_airplane(device_id)
                     
                 else:
                     logger.warning("未知命令或参数不足")
                     
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 break
             except Exception as e:
                 logger.error(f"命令执行错误: {e}")
                 
+    def _get_airplane(self, device_id: int):
+        """获取无人机对象（已存在时直接查字典，不存在时由管理器创建）"""
+        airplane = self.manager.airplanes.get(device_id)
+        if airplane is None:
+            airplane = self.manager.get_airplane(device_id)
+        return airplane
+
     async def _arm_airplane(self, device_id: int):
-        airplane = await self.manager.get_airplane(device_id)
-        await airplane.arm()
-        logger.info(f"已发送解锁命令给无人机 {device_id}")
+        self._get_airplane(device_id).arm()
+        logger.info("已发送解锁命令给无人机 %d", device_id)
         
     async def _disarm_airplane(self, device_id: int):
-        airplane = await self.manager.get_airplane(device_id)
-        await airplane.disarm()
-        logger.info(f"已发送锁定命令给无人机 {device_id}")
+        self._get_airplane(device_id).disarm()
+        logger.info("已发送锁定命令给无人机 %d", device_id)
         
     async def _takeoff_airplane(self, device_id: int, altitude: float):
-        airplane = await self.manager.get_airplane(device_id)
-        await airplane.takeoff(altitude)
-        logger.info(f"已发送起飞命令给无人机 {device_id}，目标高度 {altitude} 米")
+        self._get_airplane(device_id).takeoff(altitude)
+        logger.info("已发送起飞命令给无人机 %d，目标高度 %s 米", device_id, altitude)
         
     async def _land_airplane(self, device_id: int):
-        airplane = await self.manager.get_airplane(device_id)
-        await airplane.land()
-        logger.info(f"已发送降落命令给无人机 {device_id}")
+        self._get_airplane(device_id).land()
+        logger.info("已发送降落命令给无人机 %d", device_id)
         
     async def _rtl_airplane(self, device_id: int):
-        airplane = await self.manager.get_airplane(device_id)
-        await airplane.return_to_launch()
-        logger.info(f"已发送返航命令给无人机 {device_id}")
+        self._get_airplane(device_id).return_to_launch()
+        logger.info("已发送返航命令给无人机 %d", device_id)
 
-def signal_handler(signum, frame):
-    """信号处理器"""
+async def _shutdown(control_system: AirplaneControlSystem):
+    """收到退出信号：停止各模式循环并取消其余任务"""
     logger.info("接收到退出信号，正在关闭系统...")
-    sys.exit(0)
+    control_system.is_running = False
+    current = asyncio.current_task()
+    for task in asyncio.all_tasks():
+        if task is not current:
+            task.cancel()
+
+async def _run_mode(control_system: AirplaneControlSystem, coro):
+    """在事件循环中运行指定模式，并由事件循环处理退出信号"""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, lambda: loop.create_task(_shutdown(control_system)))
+        except (NotImplementedError, RuntimeError):
+            # Windows 不支持 add_signal_handler，保留默认的 KeyboardInterrupt 行为
+            pass
+    try:
+        await coro
+    except asyncio.CancelledError:
+        pass
 
 def main():
     """主函数"""
-    # 注册信号处理器
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
     # 配置参数
     SERIAL_PORT = None  # 设置为实际的串口，如 'COM3' 或 '/dev/ttyUSB0'
     BAUDRATE = 115200
@@ -253,15 +318,15 @@ def main():
         
         if choice == '1':
             logger.info("启动监控模式")
-            asyncio.run(control_system.monitor_airplanes())
+            asyncio.run(_run_mode(control_system, control_system.monitor_airplanes()))
             
         elif choice == '2':
             logger.info("启动模拟模式")
-            asyncio.run(control_system.simulate_multiple_airplanes())
+            asyncio.run(_run_mode(control_system, control_system.simulate_multiple_airplanes()))
             
         elif choice == '3':
             logger.info("启动交互模式")
-            control_system.run_interactive_mode()
+            asyncio.run(_run_mode(control_system, control_system.run_interactive_mode()))
             
         else:
             logger.error("无效选择")
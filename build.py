@@ -9,95 +9,191 @@ import os
 import sys
 import shutil
 import subprocess
+import hashlib
+import logging
+from importlib.util import find_spec
+
+logger = logging.getLogger(__name__)
+
+# 构建结果缓存目录：按源码内容哈希保存上一次生成的 dist 文件
+BUILD_CACHE_DIR = '.build_cache'
+# 参与哈希的非 .py 文件（setup.py 会读取它们）
+HASH_EXTRA_FILES = ('pyproject.toml', 'README.md', 'requirements.txt')
+# git 不可用时遍历目录计算哈希，跳过这些目录
+HASH_SKIP_DIRS = {'.git', 'build', 'dist', BUILD_CACHE_DIR, '__pycache__', '.venv', 'venv'}
+
+
+def list_source_files():
+    """列出参与哈希的 .py 文件
+
+    优先使用 git ls-files（只含受版本控制的文件，任意名称的虚拟环境都不会混入），
+    git 不可用或当前目录不是仓库时退回到遍历目录
+    """
+    try:
+        result = subprocess.run(['git', 'ls-files', '-z', '--', '*.py'],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        paths = []
+        for root, dirs, files in os.walk('.'):
+            dirs[:] = [d for d in dirs if d not in HASH_SKIP_DIRS and not d.endswith('.egg-info')]
+            paths.extend(os.path.join(root, f) for f in files if f.endswith('.py'))
+        return paths
+    # 已从工作区删除但尚未提交删除的文件不参与哈希
+    return [p for p in result.stdout.decode('utf-8').split('\0') if p and os.path.isfile(p)]
+
+
+def source_digest():
+    """计算源码内容哈希（所有 .py 文件及 HASH_EXTRA_FILES 的相对路径与内容）"""
+    paths = [name for name in HASH_EXTRA_FILES if os.path.isfile(name)]
+    paths.extend(list_source_files())
+
+    digest = hashlib.sha256()
+    for path in sorted(os.path.normpath(p).replace(os.sep, '/') for p in paths):
+        digest.update(path.encode('utf-8') + b'\0')
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def restore_cached_dist(digest):
+    """源码未变化时把缓存的构建结果复制到 dist，成功返回 True"""
+    cache_dir = os.path.join(BUILD_CACHE_DIR, digest)
+    if not os.path.isdir(cache_dir):
+        return False
+    files = os.listdir(cache_dir)
+    if not any(f.endswith('.whl') for f in files) or not any(f.endswith('.tar.gz') for f in files):
+        return False
+    os.makedirs('dist', exist_ok=True)
+    for f in files:
+        shutil.copy2(os.path.join(cache_dir, f), os.path.join('dist', f))
+    return True
+
+
+def store_dist_cache(digest):
+    """把本次 dist 中的构建结果存入缓存，只保留最新一份"""
+    if os.path.isdir(BUILD_CACHE_DIR):
+        shutil.rmtree(BUILD_CACHE_DIR)
+    shutil.copytree('dist', os.path.join(BUILD_CACHE_DIR, digest))
+
 
 def run_command(cmd, description):
-    """运行命令并显示结果"""
-    print(f"\n🔄 {description}...")
+    """运行命令并显示结果
+
+    cmd 为参数列表，直接启动目标程序，不经过 /bin/sh 或 cmd.exe
+    （Python 相关命令使用 sys.executable，保证与运行本脚本的解释器/虚拟环境一致）；
+    子进程输出（stderr 合并到 stdout）逐行实时打印，不在内存中缓存整段输出
+    """
+    logger.info("%s...", description)
     try:
-        result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
-        print(f"✅ {description} 成功")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} 失败:")
-        print(f"错误: {e}")
-        if e.stdout:
-            print(f"输出: {e.stdout}")
-        if e.stderr:
-            print(f"错误输出: {e.stderr}")
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                bufsize=1, text=True)
+    except OSError as e:
+        logger.error("%s 失败: %s", description, e)
+        return False
+
+    with proc:
+        for line in proc.stdout:
+            logger.info("   %s", line.rstrip('\n'))
+    if proc.returncode != 0:
+        logger.error("%s 失败: 命令 %s 返回非零退出码 %s", description, cmd, proc.returncode)
         return False
+    logger.info("%s 成功", description)
+    return True
 
 def clean_build():
     """清理构建文件"""
-    print("🧹 清理构建文件...")
-    dirs_to_clean = ['build', 'dist', '*.egg-info']
-    for pattern in dirs_to_clean:
-        for item in os.listdir('.'):
-            if item.startswith('custom_mavlink') and item.endswith('.egg-info'):
-                if os.path.isdir(item):
-                    shutil.rmtree(item)
-                    print(f"删除目录: {item}")
-    
-    for dirname in ['build', 'dist']:
-        if os.path.exists(dirname):
-            shutil.rmtree(dirname)
-            print(f"删除目录: {dirname}")
+    logger.info("清理构建文件...")
+    # 单次扫描当前目录：build、dist 以及 custom_mavlink*.egg-info 目录，
+    # is_dir() 复用目录项中已有的类型信息，无需逐个再 stat
+    with os.scandir('.') as it:
+        to_remove = [
+            entry.name for entry in it
+            if entry.is_dir() and (
+                entry.name in ('build', 'dist')
+                or (entry.name.startswith('custom_mavlink') and entry.name.endswith('.egg-info')))
+        ]
+    for dirname in to_remove:
+        shutil.rmtree(dirname)
+        logger.info("删除目录: %s", dirname)
 
 def check_dependencies():
     """检查依赖"""
-    print("🔍 检查依赖...")
-    try:
-        import setuptools, wheel
-        print("✅ setuptools 和 wheel 已安装")
+    logger.info("检查依赖...")
+    # 只查找模块是否可导入，不实际执行 setuptools/wheel 的导入（构建由子进程完成，本进程用不到它们）
+    if find_spec("setuptools") is not None and find_spec("wheel") is not None:
+        logger.info("setuptools 和 wheel 已安装")
         return True
-    except ImportError:
-        print("❌ 缺少依赖，正在安装...")
-        return run_command("pip install setuptools wheel", "安装依赖")
+    logger.warning("缺少依赖，正在安装...")
+    return run_command([sys.executable, "-m", "pip", "install", "setuptools", "wheel"], "安装依赖")
+
+def setup_logging():
+    """未配置日志时为本模块添加输出到stdout的处理器，只输出消息本身
+
+    可通过环境变量 LOGLEVEL 调整级别（如 LOGLEVEL=WARNING 只看错误）；
+    调用方已自行配置日志（本模块或根记录器已有处理器）时不做任何改动
+    """
+    if logger.handlers or logging.getLogger().handlers:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(os.environ.get("LOGLEVEL", "INFO").upper())
 
 def build_package():
     """构建包"""
-    if not check_dependencies():
-        return False
-    
+    setup_logging()
     clean_build()
-    
-    # 构建包
-    if not run_command("python setup.py sdist bdist_wheel", "构建包"):
-        return False
+
+    # 源码内容与上次构建相同时直接复用缓存的 sdist/wheel
+    digest = source_digest()
+    if restore_cached_dist(digest):
+        logger.info("源码未变化，已复用缓存的构建结果")
+    else:
+        if not check_dependencies():
+            return False
+
+        # 构建包
+        if not run_command([sys.executable, "setup.py", "sdist", "bdist_wheel"], "构建包"):
+            return False
+        if os.path.exists('dist'):
+            store_dist_cache(digest)
     
     # 显示结果
     if os.path.exists('dist'):
-        print("\n🎉 构建成功！生成的文件:")
+        logger.info("构建成功！生成的文件:")
         for file in os.listdir('dist'):
             file_path = os.path.join('dist', file)
             size = os.path.getsize(file_path)
-            print(f"  📦 {file} ({size:,} bytes)")
+            logger.info("  %s (%s bytes)", file, f"{size:,}")
         
-        print("\n📋 后续操作:")
-        print("1. 安装本地包:")
+        logger.info("后续操作:")
+        logger.info("1. 安装本地包:")
         wheel_files = [f for f in os.listdir('dist') if f.endswith('.whl')]
         if wheel_files:
-            print(f"   pip install dist/{wheel_files[0]}")
-        
-        print("\n2. 检查包:")
-        print("   pip install twine")
-        print("   twine check dist/*")
-        
-        print("\n3. 上传到PyPI:")
-        print("   twine upload dist/*")
+            logger.info("   pip install dist/%s", wheel_files[0])
+
+        logger.info("2. 检查包:")
+        logger.info("   pip install twine")
+        logger.info("   twine check dist/*")
+
+        logger.info("3. 上传到PyPI:")
+        logger.info("   twine upload dist/*")
         
         return True
     else:
-        print("❌ 构建失败，未找到 dist 目录")
+        logger.error("构建失败，未找到 dist 目录")
         return False
 
 if __name__ == "__main__":
-    print("=" * 50)
-    print("🚀 CustomMavLink 包构建脚本")
-    print("=" * 50)
-    
+    setup_logging()
+
+    logger.info("=" * 50)
+    logger.info("CustomMavLink 包构建脚本")
+    logger.info("=" * 50)
+
     if build_package():
-        print("\n✅ 构建完成！")
+        logger.info("构建完成！")
         sys.exit(0)
     else:
-        print("\n❌ 构建失败！")
+        logger.error("构建失败！")
         sys.exit(1)
@@ -2,14 +2,19 @@
 无人机控制GUI程序 - 简单调试界面
 使用tkinter创建图形界面，每个按钮对应一个控制指令
 """
+import os
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
+from tkinter import font as tkfont
 import threading
 import logging
-from datetime import datetime
-from typing import Optional
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, TYPE_CHECKING
 import time
-from owl2.airplane_manager_owl02 import create_manager_with_serial, AirplaneOwl02
+if TYPE_CHECKING:
+    from owl2.airplane_manager_owl02 import AirplaneOwl02
 try:
     # pyserial provides a cross-platform way to list serial ports
     from serial.tools import list_ports
@@ -23,8 +28,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 管理器模块（会加载 MavLink 方言等，较慢）在后台线程中预加载，不阻塞窗口首次显示；
+# 加载完成后赋值 create_manager_with_serial，初始化管理器时通过 _get_create_manager() 获取
+create_manager_with_serial = None
+_preload_thread: Optional[threading.Thread] = None
+
+
+def _preload_imports():
+    global create_manager_with_serial
+    try:
+        from owl2.airplane_manager_owl02 import create_manager_with_serial as create
+    except Exception as e:
+        logger.warning(f"预加载管理器模块失败: {e}")
+        return
+    create_manager_with_serial = create
+
+
+def start_preload_imports():
+    """启动后台预加载线程（只启动一次）"""
+    global _preload_thread
+    if _preload_thread is None:
+        _preload_thread = threading.Thread(target=_preload_imports, name="preload_imports", daemon=True)
+        _preload_thread.start()
+
+
+def _get_create_manager():
+    """等待预加载完成并返回 create_manager_with_serial；未预加载或预加载失败时在此直接导入（失败会抛出原始异常）"""
+    if _preload_thread is not None:
+        _preload_thread.join()
+    if create_manager_with_serial is not None:
+        return create_manager_with_serial
+    from owl2.airplane_manager_owl02 import create_manager_with_serial as create
+    return create
+
 # 新增：命令任务与管理队列
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Any, Callable, Tuple, Dict
 
 @dataclass
@@ -37,28 +75,73 @@ class CommandTask:
     retries: int = 1
     on_done: Optional[Callable[[bool, Optional[Exception]], None]] = None
 
+# 可合并的移动命令：同一无人机连续的同方向移动合并为一次发送，距离相加
+_MERGEABLE_MOVES = frozenset({'forward', 'back', 'left', 'right', 'up', 'down'})
+
+
 class ManagerCommandQueue:
-    """并发命令队列：使用线程池并发处理任务，但对实际串口写操作使用锁序列化，避免冲突。
+    """命令队列：由单个写线程按顺序处理任务，串口写操作天然串行，无需额外加锁。
 
-    这样可以并发发送/等待响应（IO并发），但保证写入串口的操作被保护。
+    写线程忙时积压的任务会被一次取出，同一无人机连续的同方向移动命令合并为一条发送。
     """
-    def __init__(self, manager, max_workers: int = 8):
+    def __init__(self, manager):
         self.manager = manager
-        # 用于保护对串口的写操作（如果 manager/airplane 的方法执行串口写）
-        self._write_lock = threading.Lock()
-        # 线程池用于并发处理任务（发送/接收）
-        import concurrent.futures
-        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._queue: "queue.Queue[Optional[CommandTask]]" = queue.Queue()
         self._shutdown = False
+        self._thread = threading.Thread(target=self._writer, name="cmd_writer", daemon=True)
+        self._thread.start()
 
     def enqueue(self, task: CommandTask):
         if self._shutdown:
             return
-        # 提交任务到线程池并立即返回（非阻塞）
-        self._executor.submit(self._process_task, task)
+        # 放入队列并立即返回（非阻塞）
+        self._queue.put(task)
+
+    def _writer(self):
+        """写线程：取出当前积压的全部任务，合并后依次执行；收到 None 时退出。"""
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            batch = [task]
+            stopping = False
+            while True:
+                try:
+                    task = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    stopping = True
+                    break
+                batch.append(task)
+            for task, callbacks in self._coalesce(batch):
+                self._process_task(task, callbacks)
+            if stopping:
+                return
 
-    def _process_task(self, task: CommandTask):
-        """在独立线程中处理单个任务。"""
+    @staticmethod
+    def _coalesce(batch):
+        """合并同一无人机连续的同方向移动任务，返回 [(task, [on_done, ...]), ...]。"""
+        merged = []
+        last_by_drone = {}
+        for task in batch:
+            prev = last_by_drone.get(task.drone_id)
+            if (prev is not None and task.command in _MERGEABLE_MOVES
+                    and prev[0].command == task.command
+                    and len(task.args) == 1 and len(prev[0].args) == 1
+                    and not task.kwargs and not prev[0].kwargs):
+                prev_task = prev[0]
+                prev[0] = replace(prev_task, args=(prev_task.args[0] + task.args[0],),
+                                  retries=max(prev_task.retries, task.retries))
+                prev[1].append(task.on_done)
+                continue
+            entry = [task, [task.on_done]]
+            merged.append(entry)
+            last_by_drone[task.drone_id] = entry
+        return merged
+
+    def _process_task(self, task: CommandTask, callbacks):
+        """在写线程中处理单个（可能已合并的）任务，结果通知给所有被合并任务的回调。"""
         attempt = 0
         last_exc = None
         while attempt <= (task.retries or 0):
@@ -71,40 +154,63 @@ class ManagerCommandQueue:
                     except Exception:
                         airplane = None
 
-                # 在对串口进行写操作时加锁，防止并发写导致数据混淆
-                with self._write_lock:
-                    if airplane is not None and hasattr(airplane, task.command):
-                        getattr(airplane, task.command)(*task.args, **task.kwargs)
-                    elif hasattr(self.manager, 'send_command'):
-                        # manager 层可能提供统一发送接口
-                        self.manager.send_command(task.drone_id, task.command, *task.args, **task.kwargs)
-                    else:
-                        raise AttributeError(f"无人机对象或管理器不支持命令 {task.command}")
+                if airplane is not None and hasattr(airplane, task.command):
+                    getattr(airplane, task.command)(*task.args, **task.kwargs)
+                elif hasattr(self.manager, 'send_command'):
+                    # manager 层可能提供统一发送接口
+                    self.manager.send_command(task.drone_id, task.command, *task.args, **task.kwargs)
+                else:
+                    raise AttributeError(f"无人机对象或管理器不支持命令 {task.command}")
 
                 # 如果调用成功就调用回调并退出
-                if task.on_done:
-                    try:
-                        task.on_done(True, None)
-                    except Exception:
-                        pass
+                for on_done in callbacks:
+                    if on_done:
+                        try:
+                            on_done(True, None)
+                        except Exception:
+                            pass
                 return
             except Exception as e:
                 last_exc = e
                 time.sleep(0.05)
                 if attempt > (task.retries or 0):
-                    if task.on_done:
-                        try:
-                            task.on_done(False, e)
-                        except Exception:
-                            pass
+                    for on_done in callbacks:
+                        if on_done:
+                            try:
+                                on_done(False, e)
+                            except Exception:
+                                pass
         # 结束
 
     def stop(self, wait=True):
         self._shutdown = True
-        try:
-            self._executor.shutdown(wait=wait)
-        except Exception:
-            pass
+        # 写线程处理完已入队的任务后退出
+        self._queue.put(None)
+        if wait and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+
+# 日志区域最多保留的行数
+_LOG_MAX_LINES = 2000
+
+# 方向控制按钮：(文字, 无人机方法名, 颜色, 行, 列)
+_MOVE_BUTTONS = (
+    ("↑ 上升 (Up)", "up", "#03A9F4", 0, 1),
+    ("↑ 前进 (Forward)", "forward", "#009688", 1, 1),
+    ("← 左移 (Left)", "left", "#009688", 2, 0),
+    ("→ 右移 (Right)", "right", "#009688", 2, 2),
+    ("↓ 后退 (Back)", "back", "#009688", 3, 1),
+    ("↓ 下降 (Down)", "down", "#03A9F4", 4, 1),
+)
+
+
+def _is_int_input(text: str) -> bool:
+    """整数输入框的按键校验：只允许十进制整数（允许空串和单独的负号，方便编辑）"""
+    digits = text[1:] if text[:1] == '-' else text
+    if not digits:
+        return True
+    # 不允许前导0：Tcl 会把 "010" 当作八进制解析
+    return digits.isascii() and digits.isdigit() and (digits == '0' or digits[0] != '0')
 
 
 class DroneControlGUI:
@@ -116,17 +222,35 @@ class DroneControlGUI:
         self.root.geometry("1400x950")  # 增加窗口宽度以适应三栏布局
 
         self.manager = None
-        self.drone: Optional[AirplaneOwl02] = None
+        self.drone: Optional['AirplaneOwl02'] = None
         self.drone_id = 2
 
         # 新增：多选复选框状态字典和命令队列引用（在 manager 初始化后创建队列）
         self.id_check_vars = {}  # key: id -> tk.IntVar
         self.cmd_queue: Optional[ManagerCommandQueue] = None
 
+        # 后台任务（初始化/获取无人机/断开连接）统一交给一个常驻工作线程按顺序执行，
+        # 不再每次点击新建线程，也避免这些操作并发修改 self.manager / self.drone
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gui_worker")
+
+        # 待写入日志区域的条目：任意线程追加，主线程定时合并成一次插入
+        self._log_pending = deque()
+        self._log_flush_scheduled = False
+        # 最近一次格式化的日志时间戳 (秒, "HH:MM:SS")
+        self._log_timestamp = (-1, "")
+
         self.setup_ui()
 
     def setup_ui(self):
         """设置界面布局"""
+        # 按钮共用的命名字体：字体描述只解析一次，所有按钮引用同一字体对象
+        self.font_button = tkfont.Font(self.root, family="Arial", size=10, weight="bold")
+        self.font_button_small = tkfont.Font(self.root, family="Arial", size=9, weight="bold")
+        self.font_button_tiny = tkfont.Font(self.root, family="Arial", size=8, weight="bold")
+
+        # 整数输入框共用的校验命令（%P 为修改后的文本）
+        int_vcmd = (self.root.register(_is_int_input), '%P')
+
         # 标题
         title_label = tk.Label(
             self.root,
@@ -199,7 +323,7 @@ class DroneControlGUI:
             command=self.init_manager,
             bg="#4CAF50",
             fg="white",
-            font=("Arial", 10, "bold"),
+            font=self.font_button,
             width=20,
             height=2
         )
@@ -211,7 +335,7 @@ class DroneControlGUI:
             command=self.get_drone,
             bg="#2196F3",
             fg="white",
-            font=("Arial", 10, "bold"),
+            font=self.font_button,
             width=20,
             height=2
         )
@@ -224,7 +348,7 @@ class DroneControlGUI:
             command=self.disconnect_and_reset,
             bg="#F44336",
             fg="white",
-            font=("Arial", 10, "bold"),
+            font=self.font_button,
             width=20,
             height=2,
             state='disabled'
@@ -266,13 +390,13 @@ class DroneControlGUI:
 
         tk.Button(
             row1, text="解锁 (Arm)", command=self.arm,
-            bg="#FF9800", fg="white", font=("Arial", 10, "bold"),
+            bg="#FF9800", fg="white", font=self.font_button,
             width=15, height=2
         ).pack(side="left", padx=5, expand=True)
 
         tk.Button(
             row1, text="上锁 (Disarm)", command=self.disarm,
-            bg="#9E9E9E", fg="white", font=("Arial", 10, "bold"),
+            bg="#9E9E9E", fg="white", font=self.font_button,
             width=15, height=2
         ).pack(side="left", padx=5, expand=True)
 
@@ -282,19 +406,20 @@ class DroneControlGUI:
 
         # 起飞高度输入
         tk.Label(row2, text="高度(cm):").pack(side="left", padx=5)
-        self.takeoff_height = tk.Entry(row2, width=8)
-        self.takeoff_height.insert(0, "150")
+        self.takeoff_height_var = tk.IntVar(value=150)
+        self.takeoff_height = tk.Entry(row2, width=8, textvariable=self.takeoff_height_var,
+                                       validate="key", validatecommand=int_vcmd)
         self.takeoff_height.pack(side="left", padx=5)
 
         tk.Button(
             row2, text="起飞 (Takeoff)", command=self.takeoff,
-            bg="#8BC34A", fg="white", font=("Arial", 10, "bold"),
+            bg="#8BC34A", fg="white", font=self.font_button,
             width=12, height=2
         ).pack(side="left", padx=5, expand=True)
 
         tk.Button(
             row2, text="降落 (Land)", command=self.land,
-            bg="#FF5722", fg="white", font=("Arial", 10, "bold"),
+            bg="#FF5722", fg="white", font=self.font_button,
             width=12, height=2
         ).pack(side="left", padx=5, expand=True)
 
@@ -306,54 +431,21 @@ class DroneControlGUI:
         distance_frame = tk.Frame(move_frame)
         distance_frame.pack(fill="x", pady=5)
         tk.Label(distance_frame, text="移动距离(cm):").pack(side="left", padx=5)
-        self.move_distance = tk.Entry(distance_frame, width=10)
-        self.move_distance.insert(0, "100")
+        self.move_distance_var = tk.IntVar(value=100)
+        self.move_distance = tk.Entry(distance_frame, width=10, textvariable=self.move_distance_var,
+                                      validate="key", validatecommand=int_vcmd)
         self.move_distance.pack(side="left", padx=5)
 
         # 方向控制按钮
         direction_grid = tk.Frame(move_frame)
         direction_grid.pack(pady=5)
 
-        # 上升
-        tk.Button(
-            direction_grid, text="↑ 上升 (Up)", command=self.up,
-            bg="#03A9F4", fg="white", font=("Arial", 9, "bold"),
-            width=12, height=2
-        ).grid(row=0, column=1, padx=5, pady=5)
-
-        # 前进
-        tk.Button(
-            direction_grid, text="↑ 前进 (Forward)", command=self.forward,
-            bg="#009688", fg="white", font=("Arial", 9, "bold"),
-            width=12, height=2
-        ).grid(row=1, column=1, padx=5, pady=5)
-
-        # 左右
-        tk.Button(
-            direction_grid, text="← 左移 (Left)", command=self.left,
-            bg="#009688", fg="white", font=("Arial", 9, "bold"),
-            width=12, height=2
-        ).grid(row=2, column=0, padx=5, pady=5)
-
-        tk.Button(
-            direction_grid, text="→ 右移 (Right)", command=self.right,
-            bg="#009688", fg="white", font=("Arial", 9, "bold"),
-            width=12, height=2
-        ).grid(row=2, column=2, padx=5, pady=5)
-
-        # 后退
-        tk.Button(
-            direction_grid, text="↓ 后退 (Back)", command=self.back,
-            bg="#009688", fg="white", font=("Arial", 9, "bold"),
-            width=12, height=2
-        ).grid(row=3, column=1, padx=5, pady=5)
-
-        # 下降
-        tk.Button(
-            direction_grid, text="↓ 下降 (Down)", command=self.down,
-            bg="#03A9F4", fg="white", font=("Arial", 9, "bold"),
-            width=12, height=2
-        ).grid(row=4, column=1, padx=5, pady=5)
+        for text, direction, color, row, column in _MOVE_BUTTONS:
+            tk.Button(
+                direction_grid, text=text, command=lambda d=direction: self._move(d),
+                bg=color, fg="white", font=self.font_button_small,
+                width=12, height=2
+            ).grid(row=row, column=column, padx=5, pady=5)
 
         # ==================== 中间内容 - 高级功能 ====================
         # Goto控制区域
@@ -364,23 +456,26 @@ class DroneControlGUI:
         coords_frame.pack(fill="x", pady=5)
 
         tk.Label(coords_frame, text="X(cm):").pack(side="left", padx=5)
-        self.goto_x = tk.Entry(coords_frame, width=8)
-        self.goto_x.insert(0, "100")
+        self.goto_x_var = tk.IntVar(value=100)
+        self.goto_x = tk.Entry(coords_frame, width=8, textvariable=self.goto_x_var,
+                               validate="key", validatecommand=int_vcmd)
         self.goto_x.pack(side="left", padx=5)
 
         tk.Label(coords_frame, text="Y(cm):").pack(side="left", padx=5)
-        self.goto_y = tk.Entry(coords_frame, width=8)
-        self.goto_y.insert(0, "100")
+        self.goto_y_var = tk.IntVar(value=100)
+        self.goto_y = tk.Entry(coords_frame, width=8, textvariable=self.goto_y_var,
+                               validate="key", validatecommand=int_vcmd)
         self.goto_y.pack(side="left", padx=5)
 
         tk.Label(coords_frame, text="Z(cm):").pack(side="left", padx=5)
-        self.goto_z = tk.Entry(coords_frame, width=8)
-        self.goto_z.insert(0, "150")
+        self.goto_z_var = tk.IntVar(value=150)
+        self.goto_z = tk.Entry(coords_frame, width=8, textvariable=self.goto_z_var,
+                               validate="key", validatecommand=int_vcmd)
         self.goto_z.pack(side="left", padx=5)
 
         tk.Button(
             goto_frame, text="飞往目标点 (Goto)", command=self.goto,
-            bg="#673AB7", fg="white", font=("Arial", 10, "bold"),
+            bg="#673AB7", fg="white", font=self.font_button,
             width=20, height=2
         ).pack(pady=5)
 
@@ -424,19 +519,19 @@ class DroneControlGUI:
 
         tk.Button(
             light_mode_frame, text="常亮 (LED)", command=self.set_led,
-            bg="#FFC107", fg="black", font=("Arial", 9, "bold"),
+            bg="#FFC107", fg="black", font=self.font_button_small,
             width=12, height=2
         ).pack(side="left", padx=3, expand=True)
 
         tk.Button(
             light_mode_frame, text="呼吸灯 (Breathe)", command=self.set_breathe,
-            bg="#00BCD4", fg="white", font=("Arial", 9, "bold"),
+            bg="#00BCD4", fg="white", font=self.font_button_small,
             width=12, height=2
         ).pack(side="left", padx=3, expand=True)
 
         tk.Button(
             light_mode_frame, text="彩虹灯 (Rainbow)", command=self.set_rainbow,
-            bg="#E91E63", fg="white", font=("Arial", 9, "bold"),
+            bg="#E91E63", fg="white", font=self.font_button_small,
             width=12, height=2
         ).pack(side="left", padx=3, expand=True)
 
@@ -459,7 +554,7 @@ class DroneControlGUI:
             btn = tk.Button(
                 preset_frame, text=name, bg=color,
                 fg="white" if sum([r, g, b]) < 400 else "black",
-                font=("Arial", 8, "bold"),
+                font=self.font_button_tiny,
                 width=4, height=1,
                 command=lambda r=r, g=g, b=b: self.set_preset_color(r, g, b)
             )
@@ -469,34 +564,26 @@ class DroneControlGUI:
         mode_frame = ttk.LabelFrame(middle_panel, text="飞行模式设置", padding=10)
         mode_frame.pack(fill="x", pady=5)
 
-        mode_desc_label = tk.Label(
+        # 说明文字与三个模式按钮直接用 grid 放在面板中，按钮三列等宽
+        tk.Label(
             mode_frame,
             text="飞行模式：1-常规模式  2-巡线模式  3-跟随模式",
             font=("Arial", 8),
             fg="#666666"
-        )
-        mode_desc_label.pack(pady=2)
-
-        mode_buttons_frame = tk.Frame(mode_frame)
-        mode_buttons_frame.pack(fill="x", pady=5)
+        ).grid(row=0, column=0, columnspan=3, pady=2)
 
-        tk.Button(
-            mode_buttons_frame, text="常规模式", command=lambda: self.set_flight_mode(1),
-            bg="#4CAF50", fg="white", font=("Arial", 9, "bold"),
-            width=10, height=2
-        ).pack(side="left", padx=5, expand=True)
-
-        tk.Button(
-            mode_buttons_frame, text="巡线模式", command=lambda: self.set_flight_mode(2),
-            bg="#FF9800", fg="white", font=("Arial", 9, "bold"),
-            width=10, height=2
-        ).pack(side="left", padx=5, expand=True)
-
-        tk.Button(
-            mode_buttons_frame, text="跟随模式", command=lambda: self.set_flight_mode(3),
-            bg="#2196F3", fg="white", font=("Arial", 9, "bold"),
-            width=10, height=2
-        ).pack(side="left", padx=5, expand=True)
+        mode_buttons = (
+            ("常规模式", 1, "#4CAF50"),
+            ("巡线模式", 2, "#FF9800"),
+            ("跟随模式", 3, "#2196F3"),
+        )
+        for column, (text, mode, color) in enumerate(mode_buttons):
+            tk.Button(
+                mode_frame, text=text, command=lambda m=mode: self.set_flight_mode(m),
+                bg=color, fg="white", font=self.font_button_small,
+                width=10, height=2
+            ).grid(row=1, column=column, padx=5, pady=5)
+        mode_frame.grid_columnconfigure(tuple(range(len(mode_buttons))), weight=1, uniform="mode")
 
         # 色块检测设置区域
         detect_frame = ttk.LabelFrame(middle_panel, text="色块检测设置 (LAB颜色空间)", padding=10)
@@ -571,7 +658,7 @@ class DroneControlGUI:
 
         tk.Button(
             detect_frame, text="应用色块检测设置", command=self.apply_color_detect,
-            bg="#9C27B0", fg="white", font=("Arial", 9, "bold"),
+            bg="#9C27B0", fg="white", font=self.font_button_small,
             width=20, height=2
         ).pack(pady=5)
 
@@ -593,13 +680,13 @@ class DroneControlGUI:
 
         tk.Button(
             rotate_btn_frame, text="顺时针 (CW)", command=self.rotate_cw,
-            bg="#4CAF50", fg="white", font=("Arial", 9, "bold"),
+            bg="#4CAF50", fg="white", font=self.font_button_small,
             width=12, height=2
         ).pack(side="left", padx=5, expand=True)
 
         tk.Button(
             rotate_btn_frame, text="逆时针 (CCW)", command=self.rotate_ccw,
-            bg="#2196F3", fg="white", font=("Arial", 9, "bold"),
+            bg="#2196F3", fg="white", font=self.font_button_small,
             width=12, height=2
         ).pack(side="left", padx=5, expand=True)
 
@@ -609,33 +696,20 @@ class DroneControlGUI:
         flip_frame = ttk.LabelFrame(right_panel, text="翻滚控制", padding=10)
         flip_frame.pack(fill="x", pady=5)
 
-        flip_btn_frame = tk.Frame(flip_frame)
-        flip_btn_frame.pack(fill="x", pady=5)
-
-        # 四个翻滚按钮一排排列
-        tk.Button(
-            flip_btn_frame, text="前翻 (Flip Forward)", command=self.flip_forward,
-            bg="#FF5722", fg="white", font=("Arial", 9, "bold"),
-            width=14, height=2
-        ).pack(side="left", padx=5, pady=3, expand=True, fill='x')
-
-        tk.Button(
-            flip_btn_frame, text="后翻 (Flip Back)", command=self.flip_back,
-            bg="#9E9E9E", fg="white", font=("Arial", 9, "bold"),
-            width=14, height=2
-        ).pack(side="left", padx=5, pady=3, expand=True, fill='x')
-
-        tk.Button(
-            flip_btn_frame, text="左翻 (Flip Left)", command=self.flip_left,
-            bg="#03A9F4", fg="white", font=("Arial", 9, "bold"),
-            width=14, height=2
-        ).pack(side="left", padx=5, pady=3, expand=True, fill='x')
-
-        tk.Button(
-            flip_btn_frame, text="右翻 (Flip Right)", command=self.flip_right,
-            bg="#009688", fg="white", font=("Arial", 9, "bold"),
-            width=14, height=2
-        ).pack(side="left", padx=5, pady=3, expand=True, fill='x')
+        # 四个翻滚按钮一排排列：直接用 grid 放在面板中，四列等宽
+        flip_buttons = (
+            ("前翻 (Flip Forward)", self.flip_forward, "#FF5722"),
+            ("后翻 (Flip Back)", self.flip_back, "#9E9E9E"),
+            ("左翻 (Flip Left)", self.flip_left, "#03A9F4"),
+            ("右翻 (Flip Right)", self.flip_right, "#009688"),
+        )
+        for column, (text, command, color) in enumerate(flip_buttons):
+            tk.Button(
+                flip_frame, text=text, command=command,
+                bg=color, fg="white", font=self.font_button_small,
+                width=14, height=2
+            ).grid(row=0, column=column, padx=5, pady=8, sticky="ew")
+        flip_frame.grid_columnconfigure(tuple(range(len(flip_buttons))), weight=1, uniform="flip")
 
         # 日志输出区域
         log_frame = ttk.LabelFrame(right_panel, text="日志输出", padding=10)
@@ -679,11 +753,17 @@ class DroneControlGUI:
         self.drone_id_label.pack(side="right")
 
     def log_message(self, message, level="INFO"):
-        """在日志区域显示消息"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {level}: {message}\n"
-        self.log_text.insert(tk.END, log_entry)
-        self.log_text.see(tk.END)
+        """在日志区域显示消息（条目先入队，50ms 内的多条合并后由主线程一次写入）"""
+        # 时间戳精确到秒：同一秒内的日志复用已格式化的字符串
+        sec = int(time.time())
+        cached = self._log_timestamp
+        if cached[0] != sec:
+            cached = self._log_timestamp = (sec, time.strftime("%H:%M:%S", time.localtime(sec)))
+        timestamp = cached[1]
+        self._log_pending.append(f"[{timestamp}] {level}: {message}\n")
+        if not self._log_flush_scheduled:
+            self._log_flush_scheduled = True
+            self.root.after(50, self._flush_log)
 
         # 同时输出到logger
         if level == "ERROR":
@@ -693,6 +773,23 @@ class DroneControlGUI:
         else:
             logger.info(message)
 
+    def _flush_log(self):
+        """把积压的日志条目一次性插入日志区域，并只滚动一次"""
+        self._log_flush_scheduled = False
+        pending = self._log_pending
+        entries = []
+        while pending:
+            entries.append(pending.popleft())
+        if entries:
+            log_text = self.log_text
+            log_text.insert(tk.END, ''.join(entries))
+            # 只保留最近 _LOG_MAX_LINES 行，超出时整块删除最旧的行
+            # （每条日志以换行结尾，'end-1c' 位于最后一条之后的空行上）
+            line_count = int(log_text.index('end-1c').split('.')[0]) - 1
+            if line_count > _LOG_MAX_LINES:
+                log_text.delete('1.0', f'{line_count - _LOG_MAX_LINES + 1}.0')
+            log_text.see(tk.END)
+
     def clear_log(self):
         """清空日志"""
         self.log_text.delete(1.0, tk.END)
@@ -709,29 +806,37 @@ class DroneControlGUI:
             else:
                 text = f"当前无人机: ID={int(drone_id)}"
             # 确保在主线程更新GUI
-            if hasattr(self, 'root'):
-                try:
-                    self.root.after(0, lambda: self.drone_id_label.config(text=text))
-                except Exception:
-                    # 备用：直接配置
-                    self.drone_id_label.config(text=text)
-            else:
-                self.drone_id_label.config(text=text)
+            self._ui(self.drone_id_label.config, {'text': text})
         except Exception:
             # 忽略任何更新错误（防御性处理）
             pass
 
     def run_in_thread(self, func, *args):
-        """在线程中运行函数，避免阻塞GUI"""
+        """在后台工作线程中运行函数，避免阻塞GUI（任务按提交顺序依次执行）"""
         def wrapper():
             try:
                 func(*args)
             except Exception as e:
                 self.log_message(f"执行错误: {e}", "ERROR")
-                messagebox.showerror("错误", f"执行失败: {e}")
+                self._ui(messagebox.showerror, "错误", f"执行失败: {e}")
 
-        thread = threading.Thread(target=wrapper, daemon=True)
-        thread.start()
+        self._worker.submit(wrapper)
+
+    def _ui(self, func, *args):
+        """在Tk主线程中执行界面操作：主线程中直接调用，其他线程中通过 after(0) 转交主线程"""
+        if threading.current_thread() is threading.main_thread():
+            func(*args)
+        else:
+            self.root.after(0, func, *args)
+
+    def _set_connection_controls(self, connected: bool):
+        """连接后禁用COM口选择与初始化按钮、启用断开按钮；断开后恢复（须在主线程调用）"""
+        if hasattr(self, 'com_port_combo'):
+            self.com_port_combo.config(state='disabled' if connected else 'readonly')
+        if getattr(self, 'btn_init', None):
+            self.btn_init.config(state='disabled' if connected else 'normal')
+        if getattr(self, 'btn_disconnect', None):
+            self.btn_disconnect.config(state='normal' if connected else 'disabled')
 
     # 控制命令方法
     def init_manager(self):
@@ -742,52 +847,35 @@ class DroneControlGUI:
             messagebox.showinfo("提示", "管理器已初始化")
             return
 
+        # 输入框在主线程读取，工作线程只使用读取到的值
+        # 从下拉框获取COM口，如果未选择则使用空字符串
+        com_port = self.com_port_combo.get() if hasattr(self, 'com_port_combo') else ''
+        try:
+            baudrate = int(self.baudrate_entry.get())
+        except ValueError:
+            self.log_message("无效的波特率", "ERROR")
+            messagebox.showerror("错误", "请输入有效的波特率")
+            return
+
         def _init():
             self.log_message("正在初始化管理器...")
-            # 从下拉框获取COM口，如果未选择则使用空字符串
-            com_port = self.com_port_combo.get() if hasattr(self, 'com_port_combo') else ''
-            baudrate = self.baudrate_entry.get()
-
-            # 尝试将波特率转换为整数
-            try:
-                baudrate = int(baudrate)
-            except ValueError:
-                self.log_message("无效的波特率", "ERROR")
-                messagebox.showerror("错误", "请输入有效的波特率")
-                return
 
             # 使用串口创建管理器
-            self.manager = create_manager_with_serial(com_port, baudrate)
+            self.manager = _get_create_manager()(com_port, baudrate)
             self.manager.init()
-            # 初始化成功后，禁用COM口选择，防止在连接后被修改
-            try:
-                # manager.init() 在后台线程中执行，所有tkinter GUI更新需切换到主线程
-                if hasattr(self, 'root') and hasattr(self, 'com_port_combo'):
-                    # 禁用COM下拉，禁用初始化按钮，启用断开按钮
-                    self.root.after(0, lambda: (
-                        self.com_port_combo.config(state='disabled'),
-                        getattr(self, 'btn_init', None) and self.btn_init.config(state='disabled'),
-                        getattr(self, 'btn_disconnect', None) and self.btn_disconnect.config(state='normal')
-                    ))
-            except Exception:
-                pass
+            # 初始化成功后，禁用COM口选择，防止在连接后被修改（GUI更新切换到主线程）
+            self._ui(self._set_connection_controls, True)
             # 初始化成功后刷新无人机ID下拉列表（如果存在）
-            try:
-                self._populate_drone_ids()
-            except Exception:
-                pass
+            self._ui(self._populate_drone_ids)
 
-            # 新增：在主线程创建命令队列（自动创建）
+            # 自动创建命令队列（不涉及界面，直接在工作线程中创建）
             try:
-                if hasattr(self, 'root'):
-                    self.root.after(0, lambda: setattr(self, 'cmd_queue', ManagerCommandQueue(self.manager)))
-                else:
-                    self.cmd_queue = ManagerCommandQueue(self.manager)
+                self.cmd_queue = ManagerCommandQueue(self.manager)
             except Exception:
                 pass
 
             self.log_message("✓ 管理器初始化成功")
-            self.update_status("管理器已初始化")
+            self._ui(self.update_status, "管理器已初始化")
 
         self.run_in_thread(_init)
 
@@ -866,40 +954,38 @@ class DroneControlGUI:
 
     def get_drone(self):
         """获取无人机对象"""
+        # 在主线程从下拉框读取无人机ID，工作线程只使用读取到的值
+        try:
+            drone_id = int(self.id_combo.get())
+        except ValueError:
+            self.log_message("无效的无人机ID", "ERROR")
+            messagebox.showerror("错误", "请输入有效的无人机ID")
+            return
+
         def _get():
             if not self.manager:
                 self.log_message("请先初始化管理器", "ERROR")
-                messagebox.showwarning("警告", "请先初始化管理器")
-                return
-
-            try:
-                # 从下拉框读取无人机ID
-                self.drone_id = int(self.id_combo.get())
-            except ValueError:
-                self.log_message("无效的无人机ID", "ERROR")
-                messagebox.showerror("错误", "请输入有效的无人机ID")
+                self._ui(messagebox.showwarning, "警告", "请先初始化管理器")
                 return
 
-            self.log_message(f"正在获取无人机 (ID={self.drone_id})...")
-            self.drone = self.manager.get_airplane(self.drone_id)
-            self.log_message(f"✓ 无人机对象获取成功 (ID={self.drone_id})")
+            self.drone_id = drone_id
+            self.log_message(f"正在获取无人机 (ID={drone_id})...")
+            self.drone = self.manager.get_airplane(drone_id)
+            self.log_message(f"✓ 无人机对象获取成功 (ID={drone_id})")
             # 更新状态栏文本并更新右侧的当前无人机ID显示（在主线程中执行GUI更新）
-            try:
-                if hasattr(self, 'root'):
-                    self.root.after(0, lambda: (
-                        self.update_status(f"无人机已连接 (ID={self.drone_id})"),
-                        self.set_current_drone(self.drone_id)
-                    ))
-                else:
-                    self.update_status(f"无人机已连接 (ID={self.drone_id})")
-                    self.set_current_drone(self.drone_id)
-            except Exception:
-                # 保护性回退
-                self.update_status(f"无人机已连接 (ID={self.drone_id})")
-                self.set_current_drone(self.drone_id)
+            self._ui(self.update_status, f"无人机已连接 (ID={drone_id})")
+            self._ui(self.set_current_drone, drone_id)
 
         self.run_in_thread(_get)
 
+    @staticmethod
+    def _read_int(var: tk.IntVar) -> Optional[int]:
+        """读取整数输入框绑定的变量；输入为空或只有负号时返回None"""
+        try:
+            return var.get()
+        except tk.TclError:
+            return None
+
     def check_drone(self):
         """检查无人机是否已初始化"""
         if not self.drone:
@@ -927,9 +1013,8 @@ class DroneControlGUI:
         if not self.check_manager():
             return
 
-        try:
-            height = int(self.takeoff_height.get())
-        except ValueError:
+        height = self._read_int(self.takeoff_height_var)
+        if height is None:
             self.log_message("无效的起飞高度", "ERROR")
             messagebox.showerror("错误", "请输入有效的起飞高度(cm)")
             return
@@ -943,82 +1028,25 @@ class DroneControlGUI:
             return
         self.broadcast_command('land', retries=3)
 
-    def forward(self):
-        """前进（广播）"""
+    def _move(self, direction: str):
+        """按方向移动（广播），direction 为无人机对象的方法名：forward/back/left/right/up/down"""
         if not self.check_manager():
             return
-        try:
-            distance = int(self.move_distance.get())
-        except ValueError:
-            self.log_message("无效的移动距离", "ERROR")
-            return
-        self.broadcast_command('forward', distance)
-
-    def back(self):
-        """后退（广播）"""
-        if not self.check_manager():
-            return
-        try:
-            distance = int(self.move_distance.get())
-        except ValueError:
-            self.log_message("无效的移动距离", "ERROR")
-            return
-        self.broadcast_command('back', distance)
-
-    def left(self):
-        """左移（广播）"""
-        if not self.check_manager():
-            return
-        try:
-            distance = int(self.move_distance.get())
-        except ValueError:
-            self.log_message("无效的移动距离", "ERROR")
-            return
-        self.broadcast_command('left', distance)
-
-    def right(self):
-        """右移（广播）"""
-        if not self.check_manager():
-            return
-        try:
-            distance = int(self.move_distance.get())
-        except ValueError:
+        distance = self._read_int(self.move_distance_var)
+        if distance is None:
             self.log_message("无效的移动距离", "ERROR")
             return
-        self.broadcast_command('right', distance)
-
-    def up(self):
-        """上升（广播）"""
-        if not self.check_manager():
-            return
-        try:
-            distance = int(self.move_distance.get())
-        except ValueError:
-            self.log_message("无效的移动距离", "ERROR")
-            return
-        self.broadcast_command('up', distance)
-
-    def down(self):
-        """下降（广播）"""
-        if not self.check_manager():
-            return
-        try:
-            distance = int(self.move_distance.get())
-        except ValueError:
-            self.log_message("无效的移动距离", "ERROR")
-            return
-        self.broadcast_command('down', distance)
+        self.broadcast_command(direction, distance)
 
     def goto(self):
         """飞往目标点"""
         if not self.check_manager():
             return
 
-        try:
-            x = int(self.goto_x.get())
-            y = int(self.goto_y.get())
-            z = int(self.goto_z.get())
-        except ValueError:
+        x = self._read_int(self.goto_x_var)
+        y = self._read_int(self.goto_y_var)
+        z = self._read_int(self.goto_z_var)
+        if x is None or y is None or z is None:
             self.log_message("无效的坐标值", "ERROR")
             messagebox.showerror("错误", "请输入有效的坐标值(cm)")
             return
@@ -1186,11 +1214,11 @@ class DroneControlGUI:
             self.log_message("正在断开连接并重置状态...")
 
             # 在开始断开时立即禁用断开按钮，防止重复点击
-            try:
-                if hasattr(self, 'root') and hasattr(self, 'btn_disconnect'):
-                    self.root.after(0, lambda: self.btn_disconnect.config(state='disabled'))
-            except Exception:
-                pass
+            if hasattr(self, 'btn_disconnect'):
+                self._ui(self.btn_disconnect.config, {'state': 'disabled'})
+
+            # 先停止命令队列，已入队的命令在管理器停止前发送完
+            self._stop_cmd_queue()
 
             # 停止管理器（这会关闭串口）
             if self.manager:
@@ -1200,52 +1228,42 @@ class DroneControlGUI:
                 except Exception as e:
                     self.log_message(f"断开串口时出错: {e}", "ERROR")
 
-            # 停止命令队列
-            if getattr(self, 'cmd_queue', None):
-                try:
-                    self.cmd_queue.stop()
-                except Exception:
-                    pass
-
             # 重置对象引用
             self.manager = None
             self.drone = None
 
             # 清除当前无人机显示
-            try:
-                if hasattr(self, 'root'):
-                    self.root.after(0, lambda: self.set_current_drone(None))
-                else:
-                    self.set_current_drone(None)
-            except Exception:
-                pass
+            self._ui(self.set_current_drone, None)
 
             # 重置心跳包状态
-            self.heartbeat_var.set(True)  # 恢复默认启用
-            self.heartbeat_indicator.config(fg="#4CAF50")  # 绿色
+            self._ui(self.heartbeat_var.set, True)  # 恢复默认启用
+            self._ui(lambda: self.heartbeat_indicator.config(fg="#4CAF50"))  # 绿色
 
             # 更新状态栏
-            self.update_status("未初始化")
+            self._ui(self.update_status, "未初始化")
 
             # 重新启用COM口选择（在主线程中执行GUI更新）
-            try:
-                if hasattr(self, 'root') and hasattr(self, 'com_port_combo'):
-                    # 恢复COM下拉、启用初始化按钮并禁用断开按钮
-                    self.root.after(0, lambda: (
-                        self.com_port_combo.config(state='readonly'),
-                        getattr(self, 'btn_init', None) and self.btn_init.config(state='normal'),
-                        getattr(self, 'btn_disconnect', None) and self.btn_disconnect.config(state='disabled')
-                    ))
-            except Exception:
-                pass
+            self._ui(self._set_connection_controls, False)
 
             self.log_message("✓ 所有状态已重置")
-            messagebox.showinfo("提示", "已断开连接并重置所有状态")
+            self._ui(messagebox.showinfo, "提示", "已断开连接并重置所有状态")
 
         self.run_in_thread(_disconnect)
 
+    def _stop_cmd_queue(self):
+        """停止命令队列并清除引用（写线程处理完已入队的任务后退出，之后的广播会重新创建队列）"""
+        cmd_queue = self.cmd_queue
+        self.cmd_queue = None
+        if cmd_queue is not None:
+            try:
+                cmd_queue.stop()
+            except Exception:
+                pass
+
     def _cleanup_manager(self):
         """清理管理器资源（同步执行）"""
+        # 先停止命令队列，已入队的命令在管理器停止前发送完
+        self._stop_cmd_queue()
         if self.manager:
             try:
                 logger.info("正在停止管理器...")
@@ -1256,47 +1274,30 @@ class DroneControlGUI:
             finally:
                 self.manager = None
                 self.drone = None
-                # 停止命令队列（如果存在）
-                if getattr(self, 'cmd_queue', None):
-                    try:
-                        self.cmd_queue.stop()
-                    except Exception:
-                        pass
                 # 清除当前无人机显示
-                try:
-                    if hasattr(self, 'root'):
-                        self.root.after(0, lambda: self.set_current_drone(None))
-                    else:
-                        self.set_current_drone(None)
-                except Exception:
-                    pass
+                self._ui(self.set_current_drone, None)
                 # 在清理时恢复COM口选择并调整按钮状态为初始状态（启用初始化，禁用断开）
-                try:
-                    if hasattr(self, 'com_port_combo'):
-                        if hasattr(self, 'root'):
-                            self.root.after(0, lambda: (
-                                self.com_port_combo.config(state='readonly'),
-                                getattr(self, 'btn_init', None) and self.btn_init.config(state='normal'),
-                                getattr(self, 'btn_disconnect', None) and self.btn_disconnect.config(state='disabled')
-                            ))
-                        else:
-                            self.com_port_combo.config(state='readonly')
-                            getattr(self, 'btn_init', None) and self.btn_init.config(state='normal')
-                            getattr(self, 'btn_disconnect', None) and self.btn_disconnect.config(state='disabled')
-                except Exception:
-                    pass
+                self._ui(self._set_connection_controls, False)
 
     def on_closing(self):
-        """关闭窗口时的处理"""
-        # 同步清理资源，确保在窗口销毁前完成
-        self._cleanup_manager()
+        """关闭窗口时的处理：窗口立即隐藏，资源在后台线程清理，最多等待2秒后退出"""
+        self.root.withdraw()
+
+        # 在后台线程清理资源，主线程继续运行事件循环（清理过程中的 root.after 调用不会被阻塞）
+        cleanup = threading.Thread(target=self._cleanup_manager, name="gui_cleanup", daemon=True)
+        cleanup.start()
+        deadline = time.monotonic() + 2.0
 
-        # 销毁窗口
-        self.root.destroy()
+        def _wait_cleanup():
+            if cleanup.is_alive() and time.monotonic() < deadline:
+                self.root.after(50, _wait_cleanup)
+                return
+            # 销毁窗口
+            self.root.destroy()
+            # 强制退出程序（确保所有线程都结束，清理超时也不会卡住）
+            os._exit(0)
 
-        # 强制退出程序（确保所有线程都结束）
-        import os
-        os._exit(0)
+        _wait_cleanup()
 
     def _create_id_checkpanel(self, parent):
         """在指定父容器上创建无人机ID的多选复选框面板（0..15），支持折叠和两行并排显示。"""
@@ -1322,7 +1323,7 @@ class DroneControlGUI:
                 toggle_btn.config(text="展开")
 
         toggle_btn = tk.Button(header, text="展开", command=_toggle_visibility,
-                               bg="#FFC107", fg="black", font=("Arial", 9, "bold"), width=8)
+                               bg="#FFC107", fg="black", font=self.font_button_small, width=8)
         toggle_btn.pack(side="right", padx=4)
 
         # 内部框架，用于放置复选框（初始不显示）
@@ -1393,7 +1394,7 @@ class DroneControlGUI:
     def broadcast_command(self, command_name, *args, retries=1, **kwargs):
         """将同一命令广播发送到所有已选中的无人机（非阻塞）。
 
-        任务会提交到 ManagerCommandQueue，执行时对串口写入进行加锁以避免冲突。
+        任务会提交到 ManagerCommandQueue，由其单个写线程按顺序执行，串口写入天然串行，无需加锁。
         """
         if not self.check_manager():
             return
@@ -1414,14 +1415,8 @@ class DroneControlGUI:
         for did in ids:
             def make_cb(d=did, cmd=command_name):
                 def cb(success, exc):
-                    # 在主线程更新 UI 日志
-                    try:
-                        if hasattr(self, 'root'):
-                            self.root.after(0, lambda: self.log_message(f"{'✓' if success else '✗'} 无人机 {d} 执行 {cmd} {'成功' if success else '失败: '+str(exc)}", "INFO" if success else "ERROR"))
-                        else:
-                            self.log_message(f"{'✓' if success else '✗'} 无人机 {d} 执行 {cmd}", "INFO" if success else "ERROR")
-                    except Exception:
-                        pass
+                    # log_message 本身线程安全（日志批量刷新到界面）
+                    self.log_message(f"{'✓' if success else '✗'} 无人机 {d} 执行 {cmd} {'成功' if success else '失败: '+str(exc)}", "INFO" if success else "ERROR")
                 return cb
 
             task = CommandTask(drone_id=did, command=command_name, args=args, kwargs=kwargs, retries=retries, on_done=make_cb())
@@ -1471,6 +1466,8 @@ class DroneControlGUI:
 
 def main():
     """程序入口：创建 Tk 应用并运行 DroneControlGUI 界面。"""
+    # 先在后台开始导入管理器模块，与窗口创建并行
+    start_preload_imports()
     root = tk.Tk()
     app = DroneControlGUI(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
@@ -3,6 +3,11 @@ OWL02无人机控制包
 提供基于BR&XGF控制协议2.0的无人机控制功能
 """
 
+# MavLink CRC 改用查表实现：在包导入时统一替换一次，任何子模块（包括方言本身）
+# 的导入都会先执行这里，因此与导入顺序无关
+from .custom_protocol_packet import install_fast_crc
+install_fast_crc()
+
 # 主要控制类
 from .owl02 import Owl02
 
@@ -32,6 +37,8 @@ from .airplane_interface import (
 from .custom_protocol_packet import (
     PacketParser,
     wrap_packet,
+    calculate_checksum,
+    pack_mavlink_packet_by_custom_protocol,
     send_mavlink_packet_by_custom_protocol,
     send_raw_packet,
     receive_mavlink_packet
@@ -65,6 +72,8 @@ __all__ = [
     # 协议包工具
     'PacketParser',
     'wrap_packet',
+    'calculate_checksum',
+    'pack_mavlink_packet_by_custom_protocol',
     'send_mavlink_packet_by_custom_protocol',
     'send_raw_packet',
     'receive_mavlink_packet',
@@ -4,13 +4,15 @@
 """
 from abc import ABC, abstractmethod
 from typing import Dict, Optional, Any
+import sys
+import time
 from datetime import datetime
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import IntEnum
 
 
-# 飞行模式枚举
-class FlyModeEnum(Enum):
+# 飞行模式枚举（IntEnum：可直接与心跳包中的原始整数比较和运算）
+class FlyModeEnum(IntEnum):
     """飞行主模式枚举"""
     FLY_MODE_HOLD = 2
     FLY_MODE_POSITION = 3
@@ -19,7 +21,7 @@ class FlyModeEnum(Enum):
     INVALID = 16
 
 
-class FlyModeAutoEnum(Enum):
+class FlyModeAutoEnum(IntEnum):
     """自动飞行模式枚举"""
     FLY_MODE_AUTO_TAKEOFF = 2
     FLY_MODE_AUTO_FOLLOW = 3
@@ -29,14 +31,18 @@ class FlyModeAutoEnum(Enum):
     INVALID = 16
 
 
-class FlyModeStableEnum(Enum):
+class FlyModeStableEnum(IntEnum):
     """稳定飞行模式枚举"""
     FLY_MODE_STABLE_NORMAL = 0
     FLY_MODE_STABLE_OBSTACLE_AVOIDANCE = 2
     INVALID = 16
 
 
-@dataclass
+# Python 3.10+ 的数据类使用 __slots__，减少每个实例的内存并加快属性访问
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class GpsPosition:
     """GPS位置信息"""
     lat: float = 0.0  # 纬度
@@ -44,18 +50,29 @@ class GpsPosition:
     alt: float = 0.0  # 海拔高度（米）
     relative_alt: float = 0.0  # 相对高度（米）
     hdg: int = 0  # 航向角
+    vx: int = 0  # 北向速度（cm/s）
+    vy: int = 0  # 东向速度（cm/s）
+    vz: int = 0  # 地向速度（cm/s）
+
 
+# 单调时钟与系统时钟的偏移（纳秒），用于将单调时间戳换算为datetime
+_MONOTONIC_TO_WALL_NS = time.time_ns() - time.monotonic_ns()
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class MavLinkPacketRecord:
     """MavLink包记录"""
-    timestamp: datetime
+    timestamp: int  # 接收时间，time.monotonic_ns()
     msg_id: int
     message: Any
-    raw_packet: bytes
+
+    @property
+    def timestamp_dt(self) -> datetime:
+        """接收时间（本地时间datetime，仅在显示时换算）"""
+        return datetime.fromtimestamp((self.timestamp + _MONOTONIC_TO_WALL_NS) / 1e9)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class AirplaneState:
     """无人机状态类"""
     is_armed: bool = False  # 是否解锁
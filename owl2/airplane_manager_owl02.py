@@ -2,6 +2,8 @@
 无人机管理类，参考TypeScript的AirplaneManagerOwl02实现
 """
 import asyncio
+import queue
+from array import array
 import serial
 import time
 import threading
@@ -10,11 +12,14 @@ import logging
 from pymavlink import mavutil
 
 from .airplane_owl02 import AirplaneOwl02
-from .custom_protocol_packet import PacketParser, send_mavlink_packet_by_custom_protocol
+from .custom_protocol_packet import PacketParser, pack_mavlink_packet_by_custom_protocol
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 发送线程退出前写完队列中剩余帧的最长时间（秒）
+_SEND_DRAIN_TIMEOUT = 0.5
+
 
 class AirplaneManagerOwl02:
     """无人机管理类"""
@@ -35,10 +40,26 @@ class AirplaneManagerOwl02:
         self.receive_thread = None
         self._stop_event = threading.Event()
 
+        # 数据发送线程，单线程按入队顺序写串口，保证帧顺序
+        self.send_thread = None
+        self.send_queue: queue.Queue = queue.Queue(maxsize=1024)
+
         # 异步事件循环
         self.loop = None
         self.loop_thread = None
 
+        # 统计信息的列式缓存（按设备槽位预分配，get_statistics_fast 原地刷新）
+        self._fast_stats: Dict[str, Any] = {
+            'count': 0,
+            'device_ids': array('H', bytes(32)),
+            'is_armed': array('B', bytes(16)),
+            'is_landed': array('B', bytes(16)),
+            'fly_mode': ['UNKNOWN'] * 16,
+            'lat': array('d', [0.0] * 16),
+            'lon': array('d', [0.0] * 16),
+            'alt': array('d', [0.0] * 16),
+        }
+
     def init(self):
         """初始化管理器"""
         if self.is_init:
@@ -47,15 +68,19 @@ class AirplaneManagerOwl02:
 
         logger.info("Initializing AirplaneManagerOwl02")
 
+        # 登记使用无人机共享的回调线程池，stop() 时注销
+        AirplaneOwl02.acquire_shared_executor()
+
         # 启动异步事件循环
         self._start_async_loop()
 
         # 启动心跳定时器
         self._start_heartbeat_timer()
 
-        # 如果有串口，启动数据接收线程
+        # 如果有串口，启动数据接收和发送线程
         if self.serial_port:
             self._start_receive_thread()
+            self._start_send_thread()
 
         self.is_running = True
         logger.info("AirplaneManagerOwl02 initialized successfully")
@@ -84,7 +109,7 @@ class AirplaneManagerOwl02:
                     # 向所有无人机发送心跳（同步方式）
                     self._send_heartbeat_to_all()
                 except Exception as e:
-                    logger.error(f"Error sending heartbeat: {e}")
+                    logger.error("Error sending heartbeat: %s", e)
 
                 time.sleep(self.heartbeat_interval)
 
@@ -101,7 +126,7 @@ class AirplaneManagerOwl02:
                         self._process_serial_data()
                     except Exception as e:
                         print('=====================receive_task stop=================================')
-                        logger.error(f"Error processing serial data: {e}")
+                        logger.error("Error processing serial data: %s", e)
                         if f'{e}'.find('PermissionError'):
                             print('=====================PermissionError stop=================================')
                             # TODO disconnect COM port and stop manager
@@ -115,6 +140,44 @@ class AirplaneManagerOwl02:
         self.receive_thread = threading.Thread(target=receive_task, daemon=True)
         self.receive_thread.start()
 
+    def _start_send_thread(self):
+        """启动数据发送线程"""
+
+        def write_frame(frame: bytes):
+            serial_port = self.serial_port
+            if not serial_port or not serial_port.is_open:
+                return
+            try:
+                serial_port.write(frame)
+            except Exception as e:
+                logger.error("Error writing serial data: %s", e)
+
+        def send_task():
+            while not self._stop_event.is_set():
+                try:
+                    frame = self.send_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                write_frame(frame)
+
+            # 退出前写完队列中剩余的帧（如停止前刚入队的降落/上锁命令），最多用 _SEND_DRAIN_TIMEOUT 秒
+            deadline = time.monotonic() + _SEND_DRAIN_TIMEOUT
+            dropped = 0
+            while True:
+                try:
+                    frame = self.send_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if time.monotonic() < deadline:
+                    write_frame(frame)
+                else:
+                    dropped += 1
+            if dropped:
+                logger.warning("Send thread stopped, dropped %s queued frames", dropped)
+
+        self.send_thread = threading.Thread(target=send_task, daemon=True)
+        self.send_thread.start()
+
     def _send_heartbeat_to_all(self):
         """向所有无人机发送心跳"""
         if not self.heartbeat_enabled:
@@ -124,7 +187,7 @@ class AirplaneManagerOwl02:
             try:
                 airplane.send_heartbeat()
             except Exception as e:
-                logger.error(f"Error sending heartbeat to airplane {airplane_id}: {e}")
+                logger.error("Error sending heartbeat to airplane %s: %s", airplane_id, e)
 
     def enable_heartbeat(self):
         """启用心跳包发送"""
@@ -201,16 +264,16 @@ class AirplaneManagerOwl02:
             try:
                 # 处理MAVLink消息（仅COMMAND_MSG协议）
                 if mavlink_messages:
-                    for msg in mavlink_messages:
-                        # 异步处理消息
-                        self._handle_mavlink_message(device_id, msg, payload)
+                    # 同一载荷中解出的消息一次性交给对应的无人机对象
+                    self._handle_mavlink_messages(device_id, mavlink_messages)
                 else:
                     # 处理非COMMAND_MSG协议包
                     logger.debug(
-                        f"Received non-COMMAND_MSG packet: device={device_id}, protocol_mode={protocol_mode}, payload_len={len(payload)}")
+                        "Received non-COMMAND_MSG packet: device=%s, protocol_mode=%s, payload_len=%s",
+                        device_id, protocol_mode, len(payload))
 
             except Exception as e:
-                logger.error(f"Error processing packet from device {device_id}: {e}")
+                logger.error("Error processing packet from device %s: %s", device_id, e)
 
     def _parse_mavlink_payload(self, payload: bytes) -> list:
         """解析MavLink载荷"""
@@ -226,7 +289,7 @@ class AirplaneManagerOwl02:
                     messages.append(msg)
 
         except Exception as e:
-            logger.error(f"Error parsing MavLink payload: {e}")
+            logger.error("Error parsing MavLink payload: %s", e)
 
         return messages
 
@@ -239,10 +302,18 @@ class AirplaneManagerOwl02:
             # 解析状态
             airplane.parse_state_from_mavlink(message, raw_payload)
 
-            logger.debug(f"Processed message {message.get_msgId()} from device {device_id}")
+            logger.debug("Processed message %s from device %s", message.get_msgId(), device_id)
 
         except Exception as e:
-            logger.error(f"Error handling MavLink message from device {device_id}: {e}")
+            logger.error("Error handling MavLink message from device %s: %s", device_id, e)
+
+    def _handle_mavlink_messages(self, device_id: int, messages: list):
+        """批量处理来自同一设备的一组MavLink消息"""
+        try:
+            airplane = self.get_airplane(device_id)
+            airplane.parse_state_from_mavlink_batch(messages)
+        except Exception as e:
+            logger.error("Error handling MavLink messages from device %s: %s", device_id, e)
 
     def get_airplane(self, device_id: int) -> AirplaneOwl02:
         """获取或创建无人机对象"""
@@ -253,22 +324,58 @@ class AirplaneManagerOwl02:
             airplane = AirplaneOwl02(device_id, self)
             airplane.init()
             self.airplanes[device_id] = airplane
-            logger.info(f"Created new airplane with ID: {device_id}")
+            logger.info("Created new airplane with ID: %s", device_id)
 
         return self.airplanes[device_id]
 
     def send_msg(self, msg: Any, device_id: int):
         """发送消息给指定设备"""
+        try:
+            frame = pack_mavlink_packet_by_custom_protocol(device_id, msg)
+        except Exception as e:
+            logger.error("Error sending message to device %s: %s", device_id, e)
+            return False
+
+        if not self.send_bytes(frame):
+            return False
+        logger.debug("Sent message to device %s: %s", device_id, type(msg).__name__)
+        return True
+
+    def send_many(self, msgs):
+        """批量发送消息，所有帧拼接后一次写入串口
+
+        :param msgs: (msg, device_id) 元组的可迭代对象
+        """
+        try:
+            data = b''.join(pack_mavlink_packet_by_custom_protocol(device_id, msg) for msg, device_id in msgs)
+        except Exception as e:
+            logger.error("Error packing messages: %s", e)
+            return False
+        return self.send_bytes(data)
+
+    def send_bytes(self, data: bytes, block: bool = True):
+        """发送已封装好的自定义协议帧（可以是多帧拼接）
+
+        :param block: 发送队列已满时是否等待（最多1秒）；为False时直接丢弃并返回False
+        """
         if not self.serial_port or not self.serial_port.is_open:
             logger.error("Serial port is not open")
             return False
+        if not data:
+            return True
 
         try:
-            send_mavlink_packet_by_custom_protocol(self.serial_port, device_id, msg)
-            logger.debug(f"Sent message to device {device_id}: {type(msg).__name__}")
+            if self.send_thread and self.send_thread.is_alive():
+                # 交给发送线程写串口，调用方无需等待串口写完成
+                self.send_queue.put(data, block, 1.0)
+            else:
+                self.serial_port.write(data)
             return True
+        except queue.Full:
+            logger.warning("Send queue full, dropped %s bytes", len(data))
+            return False
         except Exception as e:
-            logger.error(f"Error sending message to device {device_id}: {e}")
+            logger.error("Error sending data: %s", e)
             return False
 
     def get_airplane_list(self) -> Dict[int, AirplaneOwl02]:
@@ -283,28 +390,35 @@ class AirplaneManagerOwl02:
         """移除无人机"""
         if device_id in self.airplanes:
             del self.airplanes[device_id]
-            logger.info(f"Removed airplane with ID: {device_id}")
+            logger.info("Removed airplane with ID: %s", device_id)
             return True
         return False
 
     def set_serial_port(self, serial_port: serial.Serial):
         """设置串口"""
         old_port = self.serial_port
-        self.serial_port = serial_port
 
-        # 如果已经初始化且有旧串口，停止接收线程
+        # 如果已经初始化且有旧串口，停止接收和发送线程（发送线程先把已入队的帧写到旧串口）
         if self.is_init and old_port:
             self._stop_event.set()
             if self.receive_thread and self.receive_thread.is_alive():
                 self.receive_thread.join(timeout=1.0)
+            if self.send_thread and self.send_thread.is_alive():
+                self.send_thread.join(timeout=1.0)
             self._stop_event.clear()
 
-        # 如果已经初始化且有新串口，启动接收线程
+        self.serial_port = serial_port
+
+        # 如果已经初始化且有新串口，启动接收和发送线程
         if self.is_init and self.serial_port:
             self._start_receive_thread()
+            self._start_send_thread()
 
     def get_statistics(self) -> Dict[str, Any]:
-        """获取统计信息"""
+        """获取统计信息
+
+        已不推荐用于周期性监控：每次调用都会重新构建嵌套字典，请改用 get_statistics_fast
+        """
         stats = {
             'airplane_count': len(self.airplanes),
             'is_running': self.is_running,
@@ -318,7 +432,7 @@ class AirplaneManagerOwl02:
                 'is_armed': airplane.state.is_armed,
                 'fly_mode': airplane.state.fly_mode.name if airplane.state.fly_mode else 'UNKNOWN',
                 'is_landed': airplane.state.is_landed,
-                'cached_packets_count': len(airplane.cached_packet_record),
+                'cached_packets_count': airplane.get_cached_packet_count(),
                 'gps_position': {
                     'lat': airplane.state.gps_position.lat,
                     'lon': airplane.state.gps_position.lon,
@@ -329,6 +443,48 @@ class AirplaneManagerOwl02:
 
         return stats
 
+    def get_statistics_fast(self) -> Dict[str, Any]:
+        """获取列式统计信息
+
+        返回的字典及其中的数组在每次调用时原地刷新，前 count 个元素有效，
+        第 i 个元素对应 device_ids[i] 号无人机。调用方不应长期持有返回值。
+        """
+        fast = self._fast_stats
+        airplanes = list(self.airplanes.items())
+        # 无人机数量超过已分配的槽位时扩容各列
+        grow = len(airplanes) - len(fast['device_ids'])
+        if grow > 0:
+            fast['device_ids'].extend(bytes(grow))
+            fast['is_armed'].extend(bytes(grow))
+            fast['is_landed'].extend(bytes(grow))
+            fast['fly_mode'].extend(['UNKNOWN'] * grow)
+            fast['lat'].extend([0.0] * grow)
+            fast['lon'].extend([0.0] * grow)
+            fast['alt'].extend([0.0] * grow)
+
+        device_ids = fast['device_ids']
+        is_armed = fast['is_armed']
+        is_landed = fast['is_landed']
+        fly_mode = fast['fly_mode']
+        lat = fast['lat']
+        lon = fast['lon']
+        alt = fast['alt']
+
+        count = 0
+        for device_id, airplane in airplanes:
+            state = airplane.state
+            gps = state.gps_position
+            device_ids[count] = device_id
+            is_armed[count] = 1 if state.is_armed else 0
+            is_landed[count] = state.is_landed
+            fly_mode[count] = state.fly_mode.name if state.fly_mode else 'UNKNOWN'
+            lat[count] = gps.lat
+            lon[count] = gps.lon
+            alt[count] = gps.alt
+            count += 1
+        fast['count'] = count
+        return fast
+
     def stop(self):
         """停止管理器"""
         if not self.is_running:
@@ -346,6 +502,10 @@ class AirplaneManagerOwl02:
         if self.receive_thread and self.receive_thread.is_alive():
             self.receive_thread.join(timeout=2.0)
 
+        # 发送线程退出前会写完队列中剩余的帧，须在关闭串口之前等它结束
+        if self.send_thread and self.send_thread.is_alive():
+            self.send_thread.join(timeout=2.0)
+
         # 停止事件循环
         if self.loop and self.loop.is_running():
             self.loop.call_soon_threadsafe(self.loop.stop)
@@ -353,6 +513,9 @@ class AirplaneManagerOwl02:
         if self.loop_thread and self.loop_thread.is_alive():
             self.loop_thread.join(timeout=2.0)
 
+        # 注销共享的回调线程池，最后一个管理器停止时才关闭（不等待进行中的回调）
+        AirplaneOwl02.release_shared_executor(wait=False)
+
         # 关闭串口
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
@@ -378,15 +541,28 @@ def get_airplane_manager_owl02() -> AirplaneManagerOwl02:
     return _global_manager
 
 
+def _enable_low_latency(ser: serial.Serial):
+    """尝试为USB串口开启ASYNC_LOW_LATENCY，减少驱动层缓冲延迟（仅Linux有效）"""
+    # pyserial 仅在 Linux 下提供 set_low_latency_mode（TIOCSSERIAL/ASYNC_LOW_LATENCY）
+    if not hasattr(ser, 'set_low_latency_mode'):
+        return
+    try:
+        ser.set_low_latency_mode(True)
+    except Exception as e:
+        # 部分驱动不支持该ioctl，保持默认设置即可
+        logger.debug("Low latency mode not supported on %s: %s", ser.port, e)
+
+
 # 便利函数
 def create_manager_with_serial(port: str, baudrate: int = 115200, timeout: float = 1.0) -> AirplaneManagerOwl02:
     """创建带串口的管理器"""
     try:
         ser = serial.Serial(port, baudrate, timeout=timeout)
+        _enable_low_latency(ser)
         manager = AirplaneManagerOwl02(ser)
         return manager
     except serial.SerialException as e:
-        logger.error(f"Failed to create serial connection: {e}")
+        logger.error("Failed to create serial connection: %s", e)
         raise
 
 
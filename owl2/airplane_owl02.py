@@ -1,18 +1,26 @@
 """
 无人机对象类，基于BR&XGF控制协议2.0实现
 """
-from datetime import datetime
-from typing import Dict, Optional, Any, Callable
+import array
+import dataclasses
+import heapq
+import itertools
+from contextlib import contextmanager
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Dict, Optional, Any, Callable, FrozenSet, Mapping
 from .commonACFly import commonACFly_py3 as mavlink2
 import threading
 import logging
+import struct
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from .airplane_interface import (
     IAirplane, FlyModeEnum, FlyModeAutoEnum, FlyModeStableEnum,
     AirplaneState, MavLinkPacketRecord
 )
 from .image_receiver import ImageReceiver
+from .custom_protocol_packet import pack_mavlink_packet_by_custom_protocol
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -23,9 +31,140 @@ RECEIVE_COMMAND = 1  # 接收到命令
 FINISH_COMMAND = 2  # 完成动作
 COMMAND_ERROR = 3  # 拒绝执行指令
 
+
+def _build_mode_table(mapping: dict, default) -> tuple:
+    """构建以模式字节(0-255)为下标的查找表"""
+    table = [default] * 256
+    for value, mode in mapping.items():
+        table[value] = mode
+    return tuple(table)
+
+
+# 心跳包 custom_mode 中的主模式/子模式查找表
+_MAIN_MODE_TABLE = _build_mode_table({
+    2: FlyModeEnum.FLY_MODE_HOLD,
+    3: FlyModeEnum.FLY_MODE_POSITION,
+    4: FlyModeEnum.FLY_MODE_AUTO,
+}, FlyModeEnum.INVALID)
+
+_AUTO_SUB_TABLE = _build_mode_table({
+    2: FlyModeAutoEnum.FLY_MODE_AUTO_TAKEOFF,
+    3: FlyModeAutoEnum.FLY_MODE_AUTO_FOLLOW,
+    4: FlyModeAutoEnum.FLY_MODE_AUTO_MISSION,
+    5: FlyModeAutoEnum.FLY_MODE_AUTO_RTL,
+    6: FlyModeAutoEnum.FLY_MODE_AUTO_LAND,
+}, FlyModeAutoEnum.INVALID)
+
+_STABLE_SUB_TABLE = _build_mode_table({
+    0: FlyModeStableEnum.FLY_MODE_STABLE_NORMAL,
+    2: FlyModeStableEnum.FLY_MODE_STABLE_OBSTACLE_AVOIDANCE,
+}, FlyModeStableEnum.INVALID)
+
+# 心跳解析中使用的原始主模式值与无效子模式
+_MAIN_MODE_POSITION = int(FlyModeEnum.FLY_MODE_POSITION)
+_MAIN_MODE_AUTO = int(FlyModeEnum.FLY_MODE_AUTO)
+_AUTO_INVALID = FlyModeAutoEnum.INVALID
+_STABLE_INVALID = FlyModeStableEnum.INVALID
+
+
+# 未知消息ID在槽位表中的取值
+_NO_SLOT = 0xFF
+
+
+def _build_slot_table(msg_ids) -> bytes:
+    """构建 msg_id -> 紧凑槽位号 的查找表（每个ID占1字节，未知ID为 _NO_SLOT）"""
+    table = bytearray([_NO_SLOT]) * (max(msg_ids) + 1)
+    for slot, msg_id in enumerate(msg_ids):
+        table[msg_id] = slot
+    return bytes(table)
+
+
+# COMMAND_LONG消息模板：固定字段预先填好，只用于复制属性，自身从不打包发送
+_COMMAND_LONG = mavlink2.MAVLink_command_long_message
+_COMMAND_LONG_TEMPLATE = _COMMAND_LONG(
+    target_system=1,
+    target_component=1,
+    command=0,
+    confirmation=0,
+    param1=0,
+    param2=0,
+    param3=0,
+    param4=0,
+    param5=0,
+    param6=0,
+    param7=0,
+)
+
+# GLOBAL_POSITION_INT 的换算系数（degE7 -> 度，mm -> 米），以乘法代替除法
+_INV_1E7 = 1e-7
+_INV_1E3 = 1e-3
+
+# 收包热路径使用的单调时钟（模块级绑定，省去每次的属性查找）
+_now = time.monotonic_ns
+
+# 方言中的AUTOPILOT_VERSION是否带有uid2字段（导入时检查一次）
+_HAS_UID2 = 'uid2' in mavlink2.MAVLink_autopilot_version_message.fieldnames
+# 序列号由uid2前3个uint32按大端拼接后转为十六进制
+_pack_sn = struct.Struct('>III').pack
+
+# MAV_CMD_EXT_DRONE_MOVE 的方向码（param1）及日志名称
+_MOVE_UP = 1
+_MOVE_DOWN = 2
+_MOVE_FORWARD = 3
+_MOVE_BACK = 4
+_MOVE_LEFT = 5
+_MOVE_RIGHT = 6
+_MOVE_DIRECTIONS = (None, 'up', 'down', 'forward', 'back', 'left', 'right')
+
+
+def _clamp(x, lo, hi):
+    """把 x 限制在 [lo, hi] 范围内（等价于 max(lo, min(hi, x))，只需一次函数调用）"""
+    return lo if x < lo else hi if x > hi else x
+
+
+# 共享线程池的最大线程数：只用于执行ACK回调（重发与等待应答的计时由重发调度线程负责），
+# 按设备数(16)×每台5个并发命令设置，线程按需创建，空闲线程可被所有无人机复用
+_RETRY_MAX_WORKERS = 16 * 5
+
+
+# CommandStatus.flags 的状态位
+_CMD_RECEIVED = 0x1
+_CMD_FINISHED = 0x2
+_CMD_ERROR = 0x4
+_CMD_STOPPED = 0x8
+# 已收到任意应答（接收/完成/出错）
+_CMD_ANSWERED = _CMD_RECEIVED | _CMD_FINISHED | _CMD_ERROR
+
+
+def _flag_property(bit: int, doc: str) -> property:
+    """把 flags 中的一位暴露为布尔属性（兼容原来的 is_xxx 字段）"""
+
+    def getter(self) -> bool:
+        return bool(self.flags & bit)
+
+    def setter(self, value: bool):
+        if value:
+            self.flags |= bit
+        else:
+            self.flags &= ~bit
+
+    return property(getter, setter, doc=doc)
+
+
 # TODO make it print able
 class CommandStatus:
-    """命令状态追踪"""
+    """命令状态追踪
+
+    接收/完成/出错/停止四个状态合并在 flags 的各个位中，判断是否已有结果只需一次位与；
+    is_received 等属性仍可照常读写
+    """
+    __slots__ = ('command', 'sequence', 'timestamp', 'receive_count', 'finish_count',
+                 'flags', 'last_update', 'create_time', 'ack_result_param2')
+
+    is_received = _flag_property(_CMD_RECEIVED, "是否已接收")
+    is_finished = _flag_property(_CMD_FINISHED, "是否已完成")
+    is_error = _flag_property(_CMD_ERROR, "是否被拒绝执行")
+    is_stopped = _flag_property(_CMD_STOPPED, "是否被停止")
 
     def __init__(self, command: int, sequence: int, timestamp: int):
         self.command = command
@@ -33,32 +172,156 @@ class CommandStatus:
         self.timestamp = timestamp  # Param7时间戳（整数毫秒），用于避免重复包
         self.receive_count = 0  # 接收应答计数
         self.finish_count = 0  # 完成应答计数
-        self.is_received = False
-        self.is_finished = False
-        self.is_error = False
-        self.is_stopped = False  # 新增：标记是否被停止
+        self.flags = 0  # _CMD_xxx 状态位
         self.last_update = time.time()
         self.create_time = time.time()
         self.ack_result_param2: int = 0
 
 
+class _PendingRetry:
+    """等待应答、由重发调度线程定时重发的命令"""
+    __slots__ = ('key', 'timestamp', 'frame', 'wait_for_finish', 'done_mask', 'ack_callback',
+                 'max_retries', 'attempts', 'timeout', 'deadline', 'future')
+
+    def __init__(self, key: tuple, timestamp: int, frame: bytes,
+                 wait_for_finish: bool, ack_callback: Optional[Callable[[CommandStatus], None]],
+                 max_retries: int, timeout: float):
+        self.key = key
+        self.timestamp = timestamp
+        self.frame = frame  # 已封装好的命令帧，每次重发原样发送
+        self.wait_for_finish = wait_for_finish
+        # 命令状态 flags 中出现这些位即视为有结果
+        self.done_mask = _CMD_FINISHED | _CMD_ERROR if wait_for_finish else _CMD_ANSWERED
+        self.ack_callback = ack_callback
+        self.max_retries = max_retries
+        self.attempts = 0  # 已发送次数
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout  # 总超时时刻（time.monotonic）
+        # 与线程池任务一样直接置为运行中，不可取消
+        self.future: Future = Future()
+        self.future.set_running_or_notify_cancel()
+
+
+class _RetryScheduler:
+    """命令重发调度线程
+
+    所有无人机的定时任务（命令重发检查、等待ACK超时）按到期时间放在一个堆里，单个线程睡眠到
+    最近的到期时刻再执行；收到ACK的命令由 _parse_ack 直接完成，不经过这里
+    """
+
+    def __init__(self):
+        self._heap: list = []  # (due_time, tie_breaker, func, arg)
+        self._counter = itertools.count()
+        self._cond = threading.Condition(threading.Lock())
+        self._thread = threading.Thread(target=self._run, name="cmd_retry_scheduler", daemon=True)
+        self._thread.start()
+
+    def schedule(self, due_time: float, func: Callable[[Any], None], arg: Any):
+        """在 due_time（time.monotonic）时刻于调度线程中调用 func(arg)，func 不应阻塞"""
+        with self._cond:
+            entry = (due_time, next(self._counter), func, arg)
+            heapq.heappush(self._heap, entry)
+            # 只有新条目成为最早到期项时才需要唤醒调度线程重新计算睡眠时间
+            if self._heap[0] is entry:
+                self._cond.notify()
+
+    def _run(self):
+        heap = self._heap
+        cond = self._cond
+        while True:
+            with cond:
+                while True:
+                    if not heap:
+                        cond.wait()
+                        continue
+                    delay = heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    cond.wait(delay)
+                _, _, func, arg = heapq.heappop(heap)
+            try:
+                func(arg)
+            except Exception as e:
+                logger.error("Error in command retry scheduler: %s", e)
+
+
 class AirplaneOwl02(IAirplane):
     """无人机对象类 - 基于BR&XGF控制协议2.0"""
 
     obstacle_distance_change_callback: Optional[Callable[[int], None]] = None  # 障碍物距离变化回调
 
+    # 消息解析表：msg_id -> 解析方法名（类级别常量，所有实例共享；带点的名称指向子对象的方法）
+    _PARSE_METHOD_NAMES: Mapping[int, str] = MappingProxyType({
+        mavlink2.MAVLINK_MSG_ID_HEARTBEAT: '_parse_heartbeat',
+        mavlink2.MAVLINK_MSG_ID_EXTENDED_SYS_STATE: '_parse_land_state',
+        mavlink2.MAVLINK_MSG_ID_AUTOPILOT_VERSION: '_parse_autopilot_version',
+        mavlink2.MAVLINK_MSG_ID_STATUSTEXT: '_parse_status_text',
+        mavlink2.MAVLINK_MSG_ID_COMMAND_ACK: '_parse_ack',
+        mavlink2.MAVLINK_MSG_ID_GLOBAL_POSITION_INT: '_parse_gps_pos',
+        mavlink2.MAVLINK_MSG_ID_BATTERY_STATUS: '_parse_battery_status',
+        mavlink2.MAVLINK_MSG_ID_OBSTACLE_DISTANCE: '_parse_obstacle_distance',
+        mavlink2.MAVLINK_MSG_ID_PHOTO_TOTAL_INFORMATION_ADDR_XINGUANGFEI: 'image_receiver.on_image_info',
+        mavlink2.MAVLINK_MSG_ID_PHOTO_TRANSMISSION_XINGUANGFEI: 'image_receiver.on_image_packet',
+        mavlink2.MAVLINK_MSG_ID_TAKE_PHOTO_ACK_XINGUANGFEI: 'image_receiver.on_take_photo_ack',
+    })
+
+    # 需要缓存的包ID集合
+    _CACHED_PACKET_IDS: FrozenSet[int] = frozenset({
+        mavlink2.MAVLINK_MSG_ID_GLOBAL_POSITION_INT,
+        mavlink2.MAVLINK_MSG_ID_GPS_RAW_INT,
+        mavlink2.MAVLINK_MSG_ID_GPS2_RAW,
+        mavlink2.MAVLINK_MSG_ID_VFR_HUD,
+        mavlink2.MAVLINK_MSG_ID_ATTITUDE,
+        mavlink2.MAVLINK_MSG_ID_RC_CHANNELS,
+        mavlink2.MAVLINK_MSG_ID_RC_CHANNELS_SCALED,
+        mavlink2.MAVLINK_MSG_ID_MISSION_CURRENT,
+        mavlink2.MAVLINK_MSG_ID_BATTERY_STATUS,
+        mavlink2.MAVLINK_MSG_ID_OBSTACLE_DISTANCE,
+    })
+
+    # 已知消息ID（有解析函数或需要缓存），按顺序编号为紧凑槽位 0..K-1
+    _KNOWN_MSG_IDS = tuple(sorted(_PARSE_METHOD_NAMES.keys() | _CACHED_PACKET_IDS))
+    _max_msg_id = _KNOWN_MSG_IDS[-1]
+    _slot_by_id = _build_slot_table(_KNOWN_MSG_IDS)
+
+    # 所有无人机共享的回调线程池（首次需要时创建）
+    _shared_executor: Optional[ThreadPoolExecutor] = None
+    _shared_executor_lock = threading.Lock()
+    # 正在使用共享线程池的管理器数量，最后一个管理器停止时才关闭线程池
+    _shared_executor_users = 0
+    # 所有无人机共享的重发调度线程（首次发送带重发的命令时创建）
+    _retry_scheduler: Optional[_RetryScheduler] = None
+
     def __init__(self, target_channel_id: int, manager: 'AirplaneManagerOwl02'):
         self.target_channel_id = target_channel_id
         self.manager = manager
         self.state = AirplaneState()
-
-        # 缓存最后接收到的每种MavLink包
-        self.cached_packet_record: Dict[int, MavLinkPacketRecord] = {}
-
-        # 命令状态追踪 - 使用 (command, sequence) 作为键
-        self.command_status: Dict[tuple, CommandStatus] = {}
+        # 心跳包中解析出的模式字段快照 (is_armed, fly_mode, fly_mode_auto, fly_mode_stable)
+        self._mode_snapshot = (self.state.is_armed, self.state.fly_mode,
+                               self.state.fly_mode_auto, self.state.fly_mode_stable)
+
+        # 缓存最后接收到的每种已知MavLink包：按槽位号存放的消息与接收时间戳两个平行数组
+        cache_slots = len(self._KNOWN_MSG_IDS)
+        self._msg_by_slot: list = [None] * cache_slots
+        self._ts_by_slot = array.array('q', bytes(8 * cache_slots))
+        # 每个槽位的写序号：写入期间为奇数，写完为偶数，读取方据此判断是否读到了完整的一对
+        self._seq_by_slot = array.array('Q', bytes(8 * cache_slots))
+        # get_cached_packet 最近一次构建的记录对象，只由读取方维护
+        self._record_by_slot: list = [None] * cache_slots
+        # 已记录过日志的未知消息ID，每个ID只记录一次
+        self._unknown_ids_seen = set()
+
+        # 命令状态追踪 - 按 command -> {sequence: CommandStatus} 两级索引，ACK只需查看同一命令的实例
+        self._status_by_cmd: Dict[int, Dict[int, CommandStatus]] = {}
+        # 按创建时间排序的过期堆 (create_time, command, sequence)，用于清理旧的命令状态
+        self._status_expiry_heap: list = []
+        # 命令状态锁（等待应答由重发调度线程负责，不再需要条件变量）
         self.command_lock = threading.RLock()
         self.command_sequence = 0  # 命令序列号生成器
+        # 尚未有结果的重发命令 key -> _PendingRetry，由 command_lock 保护
+        self._pending_retries: Dict[tuple, _PendingRetry] = {}
+        # 单次发送命令中等待ACK的回调 key -> ack_callback，由 command_lock 保护
+        self._ack_waiters: Dict[tuple, Callable[[CommandStatus], None]] = {}
 
         # 新增：当前正在执行的命令序列号（用于指令队列模式）
         self.current_active_command_key: Optional[tuple] = None
@@ -69,39 +332,17 @@ class AirplaneOwl02(IAirplane):
         self.async_mode = True  # 异步模式：不阻塞等待应答
         self.queue_mode = True  # 新增：队列模式，新指令到来时停止旧指令重试
 
-        # 线程池用于异步重发
-        self.executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="cmd_retry")
-
         self.image_receiver = ImageReceiver(self)
 
-        # 消息解析表
-        self.parse_table: Dict[int, Callable[[Any], None]] = {
-            mavlink2.MAVLINK_MSG_ID_HEARTBEAT: self._parse_heartbeat,
-            mavlink2.MAVLINK_MSG_ID_EXTENDED_SYS_STATE: self._parse_land_state,
-            mavlink2.MAVLINK_MSG_ID_AUTOPILOT_VERSION: self._parse_autopilot_version,
-            mavlink2.MAVLINK_MSG_ID_STATUSTEXT: self._parse_status_text,
-            mavlink2.MAVLINK_MSG_ID_COMMAND_ACK: self._parse_ack,
-            mavlink2.MAVLINK_MSG_ID_GLOBAL_POSITION_INT: self._parse_gps_pos,
-            mavlink2.MAVLINK_MSG_ID_BATTERY_STATUS: self._parse_battery_status,
-            mavlink2.MAVLINK_MSG_ID_OBSTACLE_DISTANCE: self._parse_obstacle_distance,
-            mavlink2.MAVLINK_MSG_ID_PHOTO_TOTAL_INFORMATION_ADDR_XINGUANGFEI: self.image_receiver.on_image_info,
-            mavlink2.MAVLINK_MSG_ID_PHOTO_TRANSMISSION_XINGUANGFEI: self.image_receiver.on_image_packet,
-            mavlink2.MAVLINK_MSG_ID_TAKE_PHOTO_ACK_XINGUANGFEI: self.image_receiver.on_take_photo_ack,
-        }
+        # 按槽位号直接索引的解析表（绑定到本实例），热路径上以下标访问代替字典查找
+        self._parse_vec: list = [None] * cache_slots
+        for msg_id, name in self._PARSE_METHOD_NAMES.items():
+            self._parse_vec[self._slot_by_id[msg_id]] = attrgetter(name)(self)
 
-        # 需要缓存的包ID集合
-        self.cached_packet_ids = {
-            mavlink2.MAVLINK_MSG_ID_GLOBAL_POSITION_INT,
-            mavlink2.MAVLINK_MSG_ID_GPS_RAW_INT,
-            mavlink2.MAVLINK_MSG_ID_GPS2_RAW,
-            mavlink2.MAVLINK_MSG_ID_VFR_HUD,
-            mavlink2.MAVLINK_MSG_ID_ATTITUDE,
-            mavlink2.MAVLINK_MSG_ID_RC_CHANNELS,
-            mavlink2.MAVLINK_MSG_ID_RC_CHANNELS_SCALED,
-            mavlink2.MAVLINK_MSG_ID_MISSION_CURRENT,
-            mavlink2.MAVLINK_MSG_ID_BATTERY_STATUS,
-            mavlink2.MAVLINK_MSG_ID_OBSTACLE_DISTANCE,
-        }
+        # 最近一次GPS位置信息（由 _parse_gps_pos 更新）
+        self._gps_pos_dict: Optional[Dict[str, float]] = None
+        # get_attitude 最近一次生成的 (ATTITUDE消息, 姿态字典)，消息变化时重新生成
+        self._attitude_cache: Optional[tuple] = None
 
         self.obstacle_distance_cache_info = {
             "distance": 0,
@@ -115,55 +356,166 @@ class AirplaneOwl02(IAirplane):
         }
 
         self.is_init = False
-        self._lock = threading.Lock()
 
-    def __del__(self):
-        """析构函数，清理线程池"""
-        if hasattr(self, 'executor'):
-            self.executor.shutdown(wait=False)
+        # batched() 使用的线程局部发送批次
+        self._tx_batch = threading.local()
+        # 预先打包好的心跳帧（首次发送心跳时生成）
+        self._heartbeat_frame: Optional[bytes] = None
+
+    @classmethod
+    def _get_shared_executor(cls) -> ThreadPoolExecutor:
+        """获取共享的回调线程池（不存在时创建）"""
+        executor = cls._shared_executor
+        if executor is None:
+            with cls._shared_executor_lock:
+                executor = cls._shared_executor
+                if executor is None:
+                    executor = cls._shared_executor = ThreadPoolExecutor(
+                        max_workers=_RETRY_MAX_WORKERS, thread_name_prefix="cmd_retry")
+        return executor
+
+    @classmethod
+    def _get_retry_scheduler(cls) -> _RetryScheduler:
+        """获取共享的重发调度线程（不存在时创建）"""
+        scheduler = cls._retry_scheduler
+        if scheduler is None:
+            with cls._shared_executor_lock:
+                scheduler = cls._retry_scheduler
+                if scheduler is None:
+                    scheduler = cls._retry_scheduler = _RetryScheduler()
+        return scheduler
+
+    @classmethod
+    def _submit_shared(cls, fn, *args):
+        """提交任务到共享线程池；线程池恰好被并发关闭时重新创建后再提交一次"""
+        executor = cls._get_shared_executor()
+        try:
+            return executor.submit(fn, *args)
+        except RuntimeError:
+            with cls._shared_executor_lock:
+                if cls._shared_executor is executor:
+                    cls._shared_executor = None
+            return cls._get_shared_executor().submit(fn, *args)
+
+    @classmethod
+    def acquire_shared_executor(cls):
+        """登记一个使用共享线程池的管理器（与 release_shared_executor 成对调用）"""
+        with cls._shared_executor_lock:
+            cls._shared_executor_users += 1
+
+    @classmethod
+    def release_shared_executor(cls, wait: bool = False):
+        """注销一个管理器；没有管理器在使用时关闭共享线程池"""
+        with cls._shared_executor_lock:
+            cls._shared_executor_users = max(cls._shared_executor_users - 1, 0)
+            if cls._shared_executor_users:
+                return
+        cls.shutdown_shared_executor(wait)
+
+    @classmethod
+    def shutdown_shared_executor(cls, wait: bool = False):
+        """关闭共享的回调线程池，之后需要时会重新创建"""
+        with cls._shared_executor_lock:
+            executor = cls._shared_executor
+            cls._shared_executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
 
     def init(self):
         """初始化无人机"""
         if self.is_init:
             return
         self.is_init = True
-        logger.info(f"Initializing airplane with ID: {self.target_channel_id}")
+        logger.info("Initializing airplane with ID: %s", self.target_channel_id)
         self.send_heartbeat()
 
     def send_msg(self, msg):
-        """发送消息给无人机"""
+        """发送消息给无人机（当前线程处于 batched() 中时先暂存，退出时统一发送）"""
+        frames = getattr(self._tx_batch, 'frames', None)
+        if frames is not None:
+            frames.append(pack_mavlink_packet_by_custom_protocol(self.target_channel_id, msg))
+            return True
         return self.manager.send_msg(msg, self.target_channel_id)
 
+    def _send_frame(self, frame: bytes, block: bool = True):
+        """发送已封装好的自定义协议帧（同样遵循 batched()）"""
+        frames = getattr(self._tx_batch, 'frames', None)
+        if frames is not None:
+            frames.append(frame)
+            return True
+        return self.manager.send_bytes(frame, block)
+
+    @contextmanager
+    def batched(self):
+        """批量发送：块内当前线程的 send_msg 只打包不发送，退出时合并为一次串口写入
+
+        仅对调用线程中直接发送的消息生效；异步模式下由重试线程发出的命令不在批量之内。
+        同步模式的命令在阻塞等待应答前会先把已暂存的帧发出（见 _flush_tx_batch）。
+        """
+        if getattr(self._tx_batch, 'frames', None) is not None:
+            # 已处于批量模式中，直接复用外层批次
+            yield
+            return
+        self._tx_batch.frames = []
+        try:
+            yield
+        finally:
+            frames = self._tx_batch.frames
+            self._tx_batch.frames = None
+            if frames:
+                self.manager.send_bytes(b''.join(frames))
+
+    def _flush_tx_batch(self):
+        """立即发送当前线程批次中已暂存的帧，批量模式保持不变"""
+        frames = getattr(self._tx_batch, 'frames', None)
+        if frames:
+            data = b''.join(frames)
+            frames.clear()
+            self.manager.send_bytes(data)
+
     def send_heartbeat(self):
-        """发送心跳包"""
-        heartbeat = mavlink2.MAVLink_heartbeat_message(
-            type=mavlink2.MAV_TYPE_GCS,
-            autopilot=mavlink2.MAV_AUTOPILOT_GENERIC,
-            base_mode=0,
-            custom_mode=0,
-            system_status=mavlink2.MAV_STATE_ACTIVE,
-            mavlink_version=2,
-        )
-        self.send_msg(heartbeat)
-        logger.debug(f"Sent heartbeat to device {self.target_channel_id}")
+        """发送心跳包（帧内容固定，首次发送时打包一次后复用）"""
+        frame = self._heartbeat_frame
+        if frame is None:
+            heartbeat = mavlink2.MAVLink_heartbeat_message(
+                type=mavlink2.MAV_TYPE_GCS,
+                autopilot=mavlink2.MAV_AUTOPILOT_GENERIC,
+                base_mode=0,
+                custom_mode=0,
+                system_status=mavlink2.MAV_STATE_ACTIVE,
+                mavlink_version=2,
+            )
+            frame = self._heartbeat_frame = pack_mavlink_packet_by_custom_protocol(self.target_channel_id, heartbeat)
+        # 心跳周期性发送，队列拥塞时丢弃本次即可，不阻塞心跳线程
+        self._send_frame(frame, block=False)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sent heartbeat to device %s", self.target_channel_id)
 
     def trigger_get_autopilot_version(self):
         """触发获取自动驾驶仪版本信息"""
-        request_cmd = mavlink2.MAVLink_command_long_message(
-            target_system=1,
-            target_component=1,
-            command=mavlink2.MAV_CMD_REQUEST_AUTOPILOT_CAPABILITIES,
-            confirmation=0,
-            param1=1,
-            param2=0,
-            param3=0,
-            param4=0,
-            param5=0,
-            param6=0,
-            param7=0
-        )
+        request_cmd = self._build_command_long(mavlink2.MAV_CMD_REQUEST_AUTOPILOT_CAPABILITIES, param1=1)
         return self.send_msg(request_cmd)
 
+    @staticmethod
+    def _build_command_long(command: int, param1=0, param2=0, param3=0,
+                            param4=0, param5=0, param6=0, param7=0):
+        """构建COMMAND_LONG消息（每条命令构建一次，重发时复用同一消息对象）
+
+        复制预先构建的模板实例的属性，只写入命令与参数字段，省去消息构造函数的开销
+        """
+        cmd = _COMMAND_LONG.__new__(_COMMAND_LONG)
+        fields = cmd.__dict__
+        fields.update(_COMMAND_LONG_TEMPLATE.__dict__)
+        fields['command'] = command
+        fields['param1'] = param1
+        fields['param2'] = param2
+        fields['param3'] = param3
+        fields['param4'] = param4
+        fields['param5'] = param5
+        fields['param6'] = param6
+        fields['param7'] = param7
+        return cmd
+
     def _get_next_sequence(self) -> int:
         """获取下一个命令序列号"""
         with self.command_lock:
@@ -210,120 +562,149 @@ class AirplaneOwl02(IAirplane):
             timestamp = int(time.time() * 1000) & 0x7FFFFF  # 毫秒级时间戳，限制在23位
         key = (command, sequence)
 
+        # 命令消息只构建并封装一次，使用时间戳作为param7；各次重发的字节完全相同，直接复用
+        cmd = self._build_command_long(command, param1, param2, param3,
+                                       param4, param5, param6, timestamp)
+        frame = pack_mavlink_packet_by_custom_protocol(self.target_channel_id, cmd)
+        pending = _PendingRetry(
+            key, timestamp, frame, wait_for_finish, ack_callback,
+            self.max_retries if max_retries is None else max_retries, timeout)
+
         # 创建命令状态
+        stopped = None
         with self.command_lock:
-            self.command_status[key] = CommandStatus(command, sequence, timestamp)
+            self._add_command_status(CommandStatus(command, sequence, timestamp))
+            # 在首次发送之前登记，保证再快的ACK也能找到这条待重发命令
+            self._pending_retries[key] = pending
 
             # 新增：如果启用队列模式，且当前有活动命令，则先停止当前命令
             if self.queue_mode and self.current_active_command_key and self.current_active_command_key != key:
                 old_key = self.current_active_command_key
-                old_status = self.command_status.get(old_key)
+                old_status = self._get_status(old_key)
 
                 # 检查旧命令是否还在执行中（未收到ACK）
-                if old_status and not old_status.is_received and not old_status.is_finished and not old_status.is_stopped:
-                    old_status.is_stopped = True
+                if old_status and not old_status.flags & (_CMD_RECEIVED | _CMD_FINISHED | _CMD_STOPPED):
+                    old_status.flags |= _CMD_STOPPED
                     print(
                         f"⚠️ 警告：新指令 {command}(seq={sequence}, ts={timestamp}) 到来时，上一个指令 {old_status.command}(seq={old_status.sequence}, ts={old_status.timestamp}) 仍未发送成功，停止重试上一个指令")
                     logger.warning(
-                        f"Queue mode: Stopped command {old_status.command} seq={old_status.sequence} ts={old_status.timestamp} for new command {command} seq={sequence} ts={timestamp}")
+                        "Queue mode: Stopped command %s seq=%s ts=%s for new command %s seq=%s ts=%s",
+                        old_status.command, old_status.sequence, old_status.timestamp, command, sequence, timestamp)
+                    old_pending = self._pending_retries.pop(old_key, None)
+                    if old_pending is not None:
+                        stopped = (old_pending, old_status)
 
             # 更新当前活动命令
             self.current_active_command_key = key
 
-        # 定义实际执行重试的函数
-        def _retry_task():
-            retry_count = 0
-            start_time = time.time()
-            _max_retries = self.max_retries
-            if max_retries is not None:
-                _max_retries = max_retries
-
-            while retry_count < _max_retries:
-                # 检查是否已被停止
-                with self.command_lock:
-                    status = self.command_status.get(key)
-                    if status and status.is_stopped:
-                        logger.info(f"Command {command} seq={sequence} ts={timestamp} stopped before sending")
-                        self._cleanup_active_command(key)
-                        return False
-
-                # 发送命令 - 使用相同的时间戳作为param7
-                cmd = mavlink2.MAVLink_command_long_message(
-                    target_system=1,
-                    target_component=1,
-                    command=command,
-                    confirmation=0,
-                    param1=param1,
-                    param2=param2,
-                    param3=param3,
-                    param4=param4,
-                    param5=param5,
-                    param6=param6,
-                    param7=timestamp  # 使用时间戳作为param7
-                )
-                self.send_msg(cmd)
-                logger.debug(
-                    f"Sent command {command} seq={sequence} ts={timestamp} to device {self.target_channel_id} (attempt {retry_count + 1}/{_max_retries})")
-
-                # 等待应答
-                wait_start = time.time()
-                while time.time() - wait_start < self.retry_timeout:
-                    with self.command_lock:
-                        status = self.command_status.get(key)
-                        if status:
-                            if status.is_error:
-                                logger.error(
-                                    f"Command {command} seq={sequence} ts={timestamp} rejected by device {self.target_channel_id}")
-                                self._cleanup_active_command(key)
-                                ack_callback(status)
-                                return False
-
-                            if status.is_received and not wait_for_finish:
-                                logger.info(
-                                    f"Command {command} seq={sequence} ts={timestamp} received by device {self.target_channel_id}")
-                                self._cleanup_active_command(key)
-                                ack_callback(status)
-                                return True
-
-                            if status.is_finished:
-                                logger.info(
-                                    f"Command {command} seq={sequence} ts={timestamp} finished by device {self.target_channel_id}")
-                                self._cleanup_active_command(key)
-                                ack_callback(status)
-                                return True
-
-                            # 检查是否被停止
-                            if status.is_stopped:
-                                logger.info(f"Command {command} seq={sequence} ts={timestamp} stopped by new command")
-                                self._cleanup_active_command(key)
-                                ack_callback(status)
-                                return False
-
-                    # 检查总超时
-                    if time.time() - start_time > timeout:
-                        logger.warning(f"Command {command} seq={sequence} ts={timestamp} timeout after {timeout}s")
-                        self._cleanup_active_command(key)
-                        return False
-
-                    time.sleep(0.05)  # 50ms检查间隔
-
-                retry_count += 1
-                if retry_count < _max_retries:
-                    logger.warning(
-                        f"Command {command} seq={sequence} ts={timestamp} no response, retrying... ({retry_count}/{_max_retries})")
+        if stopped is not None:
+            self._complete_retry(*stopped)
 
-            logger.error(f"Command {command} seq={sequence} ts={timestamp} failed after {_max_retries} retries")
-            self._cleanup_active_command(key)
-            return False
+        if pending.max_retries > 0:
+            # 首次发送在调用线程完成（可参与 batched() 合并），之后的重发与超时交给重发调度线程
+            self._send_retry_attempt(pending)
+        else:
+            self._fail_retry(pending)
 
         if use_async:
-            # 异步模式：提交到线程池，立即返回Future对象
-            future = self.executor.submit(_retry_task)
-            logger.debug(f"Command {command} seq={sequence} ts={timestamp} submitted asynchronously")
-            return future
+            # 异步模式：立即返回Future对象，由 _parse_ack 或重发调度线程完成
+            logger.debug("Command %s seq=%s ts=%s submitted asynchronously", command, sequence, timestamp)
+            return pending.future
+        else:
+            # 同步模式：阻塞等待完成；处于 batched() 中时先发出暂存的帧，否则首帧要等块退出才发送
+            self._flush_tx_batch()
+            return pending.future.result()
+
+    def _send_retry_attempt(self, pending: _PendingRetry):
+        """发送一次待重发命令，并在重发超时（不超过总超时）时刻交给调度线程检查"""
+        pending.attempts += 1
+        # 每次重发使用同一帧（相同的时间戳param7）
+        self._send_frame(pending.frame)
+        logger.debug(
+            "Sent command %s seq=%s ts=%s to device %s (attempt %s/%s)",
+            pending.key[0], pending.key[1], pending.timestamp, self.target_channel_id,
+            pending.attempts, pending.max_retries)
+        self._get_retry_scheduler().schedule(
+            min(time.monotonic() + self.retry_timeout, pending.deadline), self._on_retry_due, pending)
+
+    def _on_retry_due(self, pending: _PendingRetry):
+        """重发调度线程回调：命令仍未有结果时重发，否则判定超时/失败"""
+        key = pending.key
+        with self.command_lock:
+            # 已被 _parse_ack 完成或被新命令停止
+            if self._pending_retries.get(key) is not pending:
+                return
+            timed_out = time.monotonic() >= pending.deadline
+            expired = timed_out or pending.attempts >= pending.max_retries
+            if expired:
+                del self._pending_retries[key]
+
+        if not expired:
+            logger.warning(
+                "Command %s seq=%s ts=%s no response, retrying... (%s/%s)",
+                key[0], key[1], pending.timestamp, pending.attempts, pending.max_retries)
+            self._send_retry_attempt(pending)
+        elif timed_out:
+            logger.warning(
+                "Command %s seq=%s ts=%s timeout after %ss",
+                key[0], key[1], pending.timestamp, pending.timeout)
+            self._cleanup_active_command(key)
+            self._resolve_retry(pending, None, False)
+        else:
+            self._fail_retry(pending)
+
+    def _fail_retry(self, pending: _PendingRetry):
+        """重发次数用尽仍无应答"""
+        key = pending.key
+        logger.error("Command %s seq=%s ts=%s failed after %s retries",
+                     key[0], key[1], pending.timestamp, pending.max_retries)
+        self._cleanup_active_command(key)
+        self._resolve_retry(pending, None, False)
+
+    def _complete_retry(self, pending: _PendingRetry, status: CommandStatus):
+        """命令已有结果（出错/已接收/已完成/被停止）：记录日志、清理并完成Future"""
+        command, sequence = pending.key
+        timestamp = pending.timestamp
+        if status.is_error:
+            logger.error(
+                "Command %s seq=%s ts=%s rejected by device %s",
+                command, sequence, timestamp, self.target_channel_id)
+            success = False
+        elif status.is_received and not pending.wait_for_finish:
+            logger.info(
+                "Command %s seq=%s ts=%s received by device %s",
+                command, sequence, timestamp, self.target_channel_id)
+            success = True
+        elif status.is_finished:
+            logger.info(
+                "Command %s seq=%s ts=%s finished by device %s",
+                command, sequence, timestamp, self.target_channel_id)
+            success = True
         else:
-            # 同步模式：阻塞等待完成
-            return _retry_task()
+            logger.info(
+                "Command %s seq=%s ts=%s stopped by new command",
+                command, sequence, timestamp)
+            success = False
+        self._cleanup_active_command(pending.key)
+        self._resolve_retry(pending, status, success)
+
+    def _resolve_retry(self, pending: _PendingRetry, status: Optional[CommandStatus], success: bool):
+        """设置Future结果；有回调时先在线程池中执行回调，避免阻塞收包线程与调度线程"""
+        future = pending.future
+        ack_callback = pending.ack_callback
+        if ack_callback is None or status is None:
+            future.set_result(success)
+            return
+
+        def _run_callback():
+            try:
+                ack_callback(status)
+            except BaseException as e:
+                future.set_exception(e)
+                return
+            future.set_result(success)
+
+        self._submit_shared(_run_callback)
 
     def send_command_without_retry(self, command: int, param1=0, param2=0, param3=0,
                                    param4=0, param5=0, param6=0, param7=0,
@@ -366,60 +747,50 @@ class AirplaneOwl02(IAirplane):
             status = CommandStatus(command, sequence, timestamp)
             # 如果是无ACK确认的命令，直接标记为已发送完成
             if no_ack:
-                status.is_received = True
-                status.is_finished = True
-            self.command_status[key] = status
+                status.flags = _CMD_RECEIVED | _CMD_FINISHED
+            self._add_command_status(status)
 
         # 发送命令 - 使用时间戳作为param7
-        cmd = mavlink2.MAVLink_command_long_message(
-            target_system=1,
-            target_component=1,
-            command=command,
-            confirmation=0,
-            param1=param1,
-            param2=param2,
-            param3=param3,
-            param4=param4,
-            param5=param5,
-            param6=param6,
-            param7=timestamp  # 使用时间戳作为param7
-        )
+        cmd = self._build_command_long(command, param1, param2, param3,
+                                       param4, param5, param6, timestamp)
         self.send_msg(cmd)
         logger.debug(
-            f"Sent command {command} seq={sequence} ts={timestamp} to device {self.target_channel_id} (no retry, no_ack={no_ack})")
+            "Sent command %s seq=%s ts=%s to device %s (no retry, no_ack=%s)",
+            command, sequence, timestamp, self.target_channel_id, no_ack)
 
         # 如果是无ACK确认的命令，立即调用回调（如果有）
         if no_ack:
             if ack_callback is not None:
                 with self.command_lock:
-                    status = self.command_status.get(key)
-                    if status:
-                        ack_callback(status)
+                    status = self._get_status(key)
+                if status:
+                    ack_callback(status)
             return key
 
-        # 如果提供了回调函数，启动一个异步任务等待ACK并调用回调
+        # 如果提供了回调函数，登记等待ACK：收到应答时由 _parse_ack 调用回调，
+        # 5秒仍无应答时由重发调度线程调用回调，让调用方知道状态；期间不占用任何线程
         if ack_callback is not None:
-            def _wait_for_ack():
-                wait_start = time.time()
-                timeout = 5.0  # 等待ACK的超时时间
-                while time.time() - wait_start < timeout:
-                    with self.command_lock:
-                        status = self.command_status.get(key)
-                        if status:
-                            if status.is_error or status.is_received or status.is_finished:
-                                ack_callback(status)
-                                return
-                    time.sleep(0.05)  # 50ms检查间隔
-                # 超时后仍调用回调，让调用方知道状态
-                with self.command_lock:
-                    status = self.command_status.get(key)
-                    if status:
-                        ack_callback(status)
-
-            self.executor.submit(_wait_for_ack)
+            with self.command_lock:
+                status = self._get_status(key)
+                if not (status and status.flags & _CMD_ANSWERED):
+                    self._ack_waiters[key] = ack_callback
+                    status = None
+            if status is not None:
+                self._submit_shared(ack_callback, status)
+            else:
+                self._get_retry_scheduler().schedule(
+                    time.monotonic() + 5.0, self._on_ack_wait_due, key)
 
         return key
 
+    def _on_ack_wait_due(self, key: tuple):
+        """重发调度线程回调：等待ACK超时，以当前状态调用回调"""
+        with self.command_lock:
+            ack_callback = self._ack_waiters.pop(key, None)
+            status = self._get_status(key) if ack_callback is not None else None
+        if status:
+            self._submit_shared(ack_callback, status)
+
     def get_command_status(self, key: tuple) -> Optional[CommandStatus]:
         """
         根据key查询命令状态
@@ -441,7 +812,30 @@ class AirplaneOwl02(IAirplane):
                     print("等待响应中...")
         """
         with self.command_lock:
-            return self.command_status.get(key)
+            return self._get_status(key)
+
+    def _get_status(self, key: tuple) -> Optional[CommandStatus]:
+        """按 (command, sequence) 查找命令状态（调用方需持有 command_lock）"""
+        bucket = self._status_by_cmd.get(key[0])
+        return bucket.get(key[1]) if bucket else None
+
+    def _add_command_status(self, status: CommandStatus):
+        """登记命令状态，并顺带清理过期的旧状态（调用方需持有 command_lock）"""
+        self._expire_command_status(status.create_time)
+        self._status_by_cmd.setdefault(status.command, {})[status.sequence] = status
+        heapq.heappush(self._status_expiry_heap, (status.create_time, status.command, status.sequence))
+
+    def _expire_command_status(self, current_time: float):
+        """清理创建超过10秒的命令状态，只弹出堆顶已过期的条目（调用方需持有 command_lock）"""
+        heap = self._status_expiry_heap
+        expire_before = current_time - 10.0
+        while heap and heap[0][0] < expire_before:
+            _, command, sequence = heapq.heappop(heap)
+            bucket = self._status_by_cmd.get(command)
+            if bucket is not None:
+                bucket.pop(sequence, None)
+                if not bucket:
+                    del self._status_by_cmd[command]
 
     def _cleanup_active_command(self, key: tuple):
         """清理活动命令状态"""
@@ -449,53 +843,48 @@ class AirplaneOwl02(IAirplane):
             if self.current_active_command_key == key:
                 self.current_active_command_key = None
 
-    def _cache_packet_record(self, msg_id: int, message: Any, raw_packet: bytes = b''):
-        """缓存数据包记录"""
-        with self._lock:
-            record = MavLinkPacketRecord(
-                timestamp=datetime.now(),
-                msg_id=msg_id,
-                message=message,
-                raw_packet=raw_packet,
-            )
-            self.cached_packet_record[msg_id] = record
+    def _cache_packet_record(self, slot: int, message: Any):
+        """缓存数据包：只写入两个数组槽位，不再为每个包创建 MavLinkPacketRecord
+
+        只有管理器的接收线程会调用（单写者），因此不加锁；
+        写入前后各递增一次写序号，get_cached_packet 据此保证消息与时间戳属于同一个包
+        """
+        seq = self._seq_by_slot
+        seq[slot] += 1
+        self._ts_by_slot[slot] = _now()
+        self._msg_by_slot[slot] = message
+        seq[slot] += 1
 
     def _parse_heartbeat(self, message: mavlink2.MAVLink_heartbeat_message):
         """解析心跳包"""
-        self.state.is_armed = (message.base_mode & 0x80) == 0x80
+        is_armed = bool(message.base_mode & 0x80)
+
+        # 解析飞行模式：主模式在第3字节，子模式在第4字节
+        custom_mode = message.custom_mode
+        main_mode = (custom_mode >> 24) & 0xFF
+        sub_mode = (custom_mode >> 32) & 0xFF
+
+        fly_mode = _MAIN_MODE_TABLE[main_mode]
+
+        # 根据主模式解析子模式（直接比较原始模式字节，避免枚举成员查找）
+        if main_mode == _MAIN_MODE_AUTO:
+            fly_mode_auto = _AUTO_SUB_TABLE[sub_mode]
+            fly_mode_stable = _STABLE_INVALID
+        elif main_mode == _MAIN_MODE_POSITION:
+            fly_mode_auto = _AUTO_INVALID
+            fly_mode_stable = _STABLE_SUB_TABLE[sub_mode]
+        else:
+            fly_mode_auto = _AUTO_INVALID
+            fly_mode_stable = _STABLE_INVALID
 
-        # 解析飞行模式
-        main_mode = (message.custom_mode >> (8 * 3)) & 0xFF
-        sub_mode = (message.custom_mode >> (8 * 4)) & 0xFF
+        # 模式相关字段整体以一个元组发布，get_state 读取时不会看到半更新的模式
+        self._mode_snapshot = (is_armed, fly_mode, fly_mode_auto, fly_mode_stable)
 
-        mode_map = {
-            2: FlyModeEnum.FLY_MODE_HOLD,
-            3: FlyModeEnum.FLY_MODE_POSITION,
-            4: FlyModeEnum.FLY_MODE_AUTO,
-        }
-        self.state.fly_mode = mode_map.get(main_mode, FlyModeEnum.INVALID)
-
-        # 根据主模式解析子模式
-        if self.state.fly_mode == FlyModeEnum.FLY_MODE_AUTO:
-            auto_mode_map = {
-                2: FlyModeAutoEnum.FLY_MODE_AUTO_TAKEOFF,
-                3: FlyModeAutoEnum.FLY_MODE_AUTO_FOLLOW,
-                4: FlyModeAutoEnum.FLY_MODE_AUTO_MISSION,
-                5: FlyModeAutoEnum.FLY_MODE_AUTO_RTL,
-                6: FlyModeAutoEnum.FLY_MODE_AUTO_LAND,
-            }
-            self.state.fly_mode_auto = auto_mode_map.get(sub_mode, FlyModeAutoEnum.INVALID)
-            self.state.fly_mode_stable = FlyModeStableEnum.INVALID
-        elif self.state.fly_mode == FlyModeEnum.FLY_MODE_POSITION:
-            stable_mode_map = {
-                0: FlyModeStableEnum.FLY_MODE_STABLE_NORMAL,
-                2: FlyModeStableEnum.FLY_MODE_STABLE_OBSTACLE_AVOIDANCE,
-            }
-            self.state.fly_mode_stable = stable_mode_map.get(sub_mode, FlyModeStableEnum.INVALID)
-            self.state.fly_mode_auto = FlyModeAutoEnum.INVALID
-        else:
-            self.state.fly_mode_auto = FlyModeAutoEnum.INVALID
-            self.state.fly_mode_stable = FlyModeStableEnum.INVALID
+        state = self.state
+        state.is_armed = is_armed
+        state.fly_mode = fly_mode
+        state.fly_mode_auto = fly_mode_auto
+        state.fly_mode_stable = fly_mode_stable
 
     def _parse_land_state(self, message: mavlink2.MAVLink_extended_sys_state_message):
         """解析着陆状态"""
@@ -503,29 +892,26 @@ class AirplaneOwl02(IAirplane):
 
     def _parse_status_text(self, message: mavlink2.MAVLink_statustext_message):
         """解析状态文本"""
-        text = message.text.decode('utf-8').strip('\x00')
-        logger.info(f"Status text from device {self.target_channel_id}: {text}")
+        # 方言生成代码已将 text 按ASCII解码为str，这里使用原始字节按UTF-8解码，保留中文等非ASCII内容
+        # 与方言一致按C字符串处理：只解码第一个NUL之前的内容
+        raw = message._text_raw
+        end = raw.find(b'\x00')
+        text = (raw if end < 0 else raw[:end]).decode('utf-8', 'replace')
+        logger.info("Status text from device %s: %s", self.target_channel_id, text)
 
     def _parse_autopilot_version(self, message: mavlink2.MAVLink_autopilot_version_message):
         """解析自动驾驶仪版本信息"""
         self.state.flight_sw_version = message.flight_sw_version
 
-        # 解析版本号字符串
-        version_bytes = [
-            (message.flight_sw_version >> (8 * 2)) & 0xFF,
-            (message.flight_sw_version >> (8 * 1)) & 0xFF,
-            (message.flight_sw_version >> (8 * 0)) & 0xFF,
-        ]
-        self.state.flight_sw_version_string = '.'.join(map(str, version_bytes))
+        # 解析版本号字符串（取低3个字节，直接移位，不再转换为bytes）
+        v = message.flight_sw_version
+        self.state.flight_sw_version_string = f"{(v >> 16) & 0xFF}.{(v >> 8) & 0xFF}.{v & 0xFF}"
         self.state.board_version = message.board_version
 
         # 解析序列号
-        if hasattr(message, 'uid2') and len(message.uid2) >= 3:
-            uid_parts = []
-            for i in range(3):
-                uid_part = (message.uid2[i] & 0xFFFFFFFF)
-                uid_parts.append(f"{uid_part:08x}")
-            self.state.sn = ''.join(uid_parts)
+        if _HAS_UID2 and len(message.uid2) >= 3:
+            uid2 = message.uid2
+            self.state.sn = _pack_sn(uid2[0] & 0xFFFFFFFF, uid2[1] & 0xFFFFFFFF, uid2[2] & 0xFFFFFFFF).hex()
 
     def _parse_ack(self, message: mavlink2.MAVLink_command_ack_message):
         """
@@ -537,7 +923,6 @@ class AirplaneOwl02(IAirplane):
 
         注意：使用 result_param2 中的时间戳来精确匹配命令实例
         """
-        print('==============Received ACK message:', message)
         command = message.command
         result = message.result
 
@@ -545,66 +930,105 @@ class AirplaneOwl02(IAirplane):
         # 限制在23位范围内，与发送时保持一致
         ack_timestamp = int(message.result_param2) & 0x7FFFFF if hasattr(message, 'result_param2') else None
 
-        print('ack_timestamp', ack_timestamp)
+        # ACK按收包频率到达：消息对象的格式化只在DEBUG开启时进行
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received ACK from device %s: %s (ack_timestamp=%s)",
+                         self.target_channel_id, message, ack_timestamp)
 
+        # 锁内只更新状态，日志在释放锁之后输出
+        acked = []
+        completed = []
+        answered = []
         with self.command_lock:
-            # print('with self.command_lock')
-
-            # 根据命令ID和时间戳精确匹配命令实例
-            updated = False
-            for key, status in list(self.command_status.items()):
-                # 必须同时匹配命令ID和时间戳
-                if status.command == command:
-                    # 如果ACK包含时间戳，则必须匹配；否则更新所有该命令的实例（向后兼容）
-                    if ack_timestamp is not None and status.timestamp != ack_timestamp:
-                        continue
-
-                    status.last_update = time.time()
-
-                    status.ack_result_param2 = message.result_param2
-
-                    if result == RECEIVE_COMMAND:
-                        status.receive_count += 1
-                        if status.receive_count >= 1:
-                            status.is_received = True
-                        logger.debug(
-                            f"Command {command} seq={status.sequence} ts={status.timestamp} received ACK ({status.receive_count}/3)")
-                        updated = True
-
-                    elif result == FINISH_COMMAND:
-                        status.finish_count += 1
-                        if status.finish_count >= 1:
-                            status.is_finished = True
-                        logger.info(
-                            f"Command {command} seq={status.sequence} ts={status.timestamp} finished ACK ({status.finish_count}/3)")
-                        updated = True
-
-                    elif result == COMMAND_ERROR:
-                        status.is_error = True
-                        logger.error(
-                            f"Command {command} seq={status.sequence} ts={status.timestamp} error from device {self.target_channel_id}")
-                        updated = True
+            # 根据命令ID和时间戳精确匹配命令实例（只查看该命令的实例）
+            bucket = self._status_by_cmd.get(command)
+            for status in (bucket.values() if bucket else ()):
+                # 如果ACK包含时间戳，则必须匹配；否则更新所有该命令的实例（向后兼容）
+                if ack_timestamp is not None and status.timestamp != ack_timestamp:
+                    continue
+
+                status.last_update = time.time()
+
+                status.ack_result_param2 = message.result_param2
+
+                if result == RECEIVE_COMMAND:
+                    status.receive_count += 1
+                    if status.receive_count >= 1:
+                        status.flags |= _CMD_RECEIVED
+                    acked.append((status.sequence, status.timestamp, status.receive_count))
+
+                elif result == FINISH_COMMAND:
+                    status.finish_count += 1
+                    if status.finish_count >= 1:
+                        status.flags |= _CMD_FINISHED
+                    acked.append((status.sequence, status.timestamp, status.finish_count))
+
+                elif result == COMMAND_ERROR:
+                    status.flags |= _CMD_ERROR
+                    acked.append((status.sequence, status.timestamp, 0))
+
+                # 该实例对应的重发命令已有结果时，从待重发表中取出，锁外完成
+                pending = self._pending_retries.get((command, status.sequence))
+                if pending is not None and status.flags & pending.done_mask:
+                    del self._pending_retries[pending.key]
+                    completed.append((pending, status))
+                elif self._ack_waiters and status.flags & _CMD_ANSWERED:
+                    waiter = self._ack_waiters.pop((command, status.sequence), None)
+                    if waiter is not None:
+                        answered.append((waiter, status))
 
             # 清理超过10秒的旧命令状态
-            current_time = time.time()
-            keys_to_remove = [k for k, v in self.command_status.items()
-                              if current_time - v.create_time > 10.0]
-            for k in keys_to_remove:
-                del self.command_status[k]
+            self._expire_command_status(time.time())
+
+        for sequence, timestamp, count in acked:
+            if result == RECEIVE_COMMAND:
+                logger.debug(
+                    "Command %s seq=%s ts=%s received ACK (%s/3)",
+                    command, sequence, timestamp, count)
+            elif result == FINISH_COMMAND:
+                logger.info(
+                    "Command %s seq=%s ts=%s finished ACK (%s/3)",
+                    command, sequence, timestamp, count)
+            else:
+                logger.error(
+                    "Command %s seq=%s ts=%s error from device %s",
+                    command, sequence, timestamp, self.target_channel_id)
+
+        for pending, status in completed:
+            self._complete_retry(pending, status)
+        for ack_callback, status in answered:
+            self._submit_shared(ack_callback, status)
 
     def _parse_gps_pos(self, message: mavlink2.MAVLink_global_position_int_message):
         """解析GPS位置"""
-        self.state.gps_position.lat = message.lat / 1e7
-        self.state.gps_position.lon = message.lon / 1e7
-        self.state.gps_position.alt = message.alt / 1e3
-        self.state.gps_position.relative_alt = message.relative_alt / 1e3
-        self.state.gps_position.hdg = message.hdg
+        gps_position = self.state.gps_position
+        gps_position.lat = lat = message.lat * _INV_1E7
+        gps_position.lon = lon = message.lon * _INV_1E7
+        gps_position.alt = alt = message.alt * _INV_1E3
+        gps_position.relative_alt = relative_alt = message.relative_alt * _INV_1E3
+        gps_position.vx = vx = message.vx
+        gps_position.vy = vy = message.vy
+        gps_position.vz = vz = message.vz
+        gps_position.hdg = hdg = message.hdg
+
+        # 收到新包时用上面已换算的值生成一次字典，get_gps_pos 直接返回
+        self._gps_pos_dict = {
+            'lat': lat,
+            'lon': lon,
+            'alt': alt,
+            'relative_alt': relative_alt,
+            'vx': vx,
+            'vy': vy,
+            'vz': vz,
+            'hdg': hdg,
+        }
 
     def _parse_battery_status(self, message: mavlink2.MAVLink_battery_status_message):
         """解析电池状态"""
-        logger.debug(f"Battery status from device {self.target_channel_id}: "
-                     f"voltage={message.voltages}, current={message.current_battery}, "
-                     f"remaining={message.battery_remaining}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Battery status from device %s: voltage=%s, current=%s, remaining=%s",
+                self.target_channel_id, message.voltages, message.current_battery, message.battery_remaining)
         self.battery_info_cache_info = {
             "voltages": message.voltages,
             "current_battery": message.current_battery,
@@ -613,8 +1037,10 @@ class AirplaneOwl02(IAirplane):
 
     def _parse_obstacle_distance(self, message: mavlink2.MAVLink_obstacle_distance_message):
         """解析障碍物距离"""
-        logger.debug(f"Obstacle distance from device {self.target_channel_id}: "
-                     f"distances={message.distances}, sensor_type={message.sensor_type}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Obstacle distance from device %s: distances=%s, sensor_type=%s",
+                self.target_channel_id, message.distances, message.sensor_type)
         self.obstacle_distance_cache_info = {
             "distance": message.distances[0] if message.distances else 0,
             "last_update_time": time.time(),
@@ -626,96 +1052,155 @@ class AirplaneOwl02(IAirplane):
 
     def parse_state_from_mavlink(self, message: Any, raw_packet: bytes = b''):
         """从MavLink消息解析状态"""
-        msg_id = message.get_msgId()
-
-        # 缓存数据包
-        self._cache_packet_record(msg_id, message, raw_packet)
-
-        if msg_id not in [
-            mavlink2.MAVLINK_MSG_ID_GLOBAL_POSITION_INT,
-            mavlink2.MAVLINK_MSG_ID_GPS_RAW_INT,
-            mavlink2.MAVLINK_MSG_ID_GPS2_RAW,
-            mavlink2.MAVLINK_MSG_ID_VFR_HUD,
-            mavlink2.MAVLINK_MSG_ID_ATTITUDE,
-            mavlink2.MAVLINK_MSG_ID_RC_CHANNELS,
-            mavlink2.MAVLINK_MSG_ID_RC_CHANNELS_SCALED,
-            mavlink2.MAVLINK_MSG_ID_MISSION_CURRENT,
-            mavlink2.MAVLINK_MSG_ID_BATTERY_STATUS,
-
-            mavlink2.MAVLINK_MSG_ID_SYSTEM_TIME,
-            mavlink2.MAVLINK_MSG_ID_SYS_STATUS,
-            mavlink2.MAVLINK_MSG_ID_HEARTBEAT,
-        ]:
-            # print('Parsed message ID:', message)
-            pass
+        # 直接读取消息头中的ID，省去get_msgId()方法调用；
+        # 不能用类属性id：MAVLink_unknown/MAVLink_bad_data 继承了基类的 id=0（与HEARTBEAT相同），
+        # 而消息头中是负数ID（MAVLINK_MSG_ID_UNKNOWN/MAVLINK_MSG_ID_BAD_DATA）
+        msg_id = message._header.msgId
+
+        # 负数ID、超出槽位表范围或没有槽位的ID均为未知消息，不缓存也不解析
+        slot = self._slot_by_id[msg_id] if 0 <= msg_id <= self._max_msg_id else _NO_SLOT
+        if slot == _NO_SLOT:
+            self._note_unknown_id(msg_id)
+            return
+
+        # 缓存数据包（仅保留解析后的消息，raw_packet不再缓存）
+        self._cache_packet_record(slot, message)
 
-        # 查找并调用对应的解析函数
-        parse_func = self.parse_table.get(msg_id)
-        if parse_func:
+        # 查找并调用对应的解析函数（仅缓存的消息没有解析函数）
+        parse_func = self._parse_vec[slot]
+        if parse_func is not None:
             try:
                 parse_func(message)
             except Exception as e:
-                logger.error(f"Error parsing message {msg_id}: {e}")
-        else:
-            if msg_id not in self.cached_packet_ids:
-                logger.debug(f"Unknown message ID {msg_id} from device {self.target_channel_id}")
+                logger.error("Error parsing message %s: %s", msg_id, e)
+
+    def parse_state_from_mavlink_batch(self, messages):
+        """批量解析同一载荷中解出的多条MavLink消息
+
+        逻辑与 parse_state_from_mavlink 相同，热路径上用到的属性在循环外只取一次，
+        缓存写入（同 _cache_packet_record）直接内联在循环中
+        """
+        max_msg_id = self._max_msg_id
+        slot_by_id = self._slot_by_id
+        parse_vec = self._parse_vec
+        seq_by_slot = self._seq_by_slot
+        ts_by_slot = self._ts_by_slot
+        msg_by_slot = self._msg_by_slot
+        now = _now
+        for message in messages:
+            msg_id = message._header.msgId
+            slot = slot_by_id[msg_id] if 0 <= msg_id <= max_msg_id else _NO_SLOT
+            if slot == _NO_SLOT:
+                self._note_unknown_id(msg_id)
+                continue
+
+            seq_by_slot[slot] += 1
+            ts_by_slot[slot] = now()
+            msg_by_slot[slot] = message
+            seq_by_slot[slot] += 1
+
+            parse_func = parse_vec[slot]
+            if parse_func is not None:
+                try:
+                    parse_func(message)
+                except Exception as e:
+                    logger.error("Error parsing message %s: %s", msg_id, e)
+
+    def _note_unknown_id(self, msg_id: int):
+        """记录未知消息ID（每个ID只记录一次日志）"""
+        if msg_id not in self._unknown_ids_seen:
+            self._unknown_ids_seen.add(msg_id)
+            logger.debug("Unknown message ID %s from device %s", msg_id, self.target_channel_id)
 
     def get_gps_pos(self) -> Optional[Dict[str, float]]:
-        """获取GPS位置信息"""
-        record = self.cached_packet_record.get(mavlink2.MAVLINK_MSG_ID_GLOBAL_POSITION_INT)
-        if not record:
-            return None
+        """获取GPS位置信息
 
-        msg = record.message
-        return {
-            'lat': msg.lat / 1e7,
-            'lon': msg.lon / 1e7,
-            'alt': msg.alt / 1e3,
-            'relative_alt': msg.relative_alt / 1e3,
-            'vx': msg.vx,
-            'vy': msg.vy,
-            'vz': msg.vz,
-            'hdg': msg.hdg,
-        }
+        返回最近一次GLOBAL_POSITION_INT解析出的字典（每个新包生成新字典，调用方不应修改）
+        """
+        return self._gps_pos_dict
 
     def get_attitude(self) -> Optional[Dict[str, float]]:
-        """获取姿态信息"""
-        record = self.cached_packet_record.get(mavlink2.MAVLINK_MSG_ID_ATTITUDE)
-        if not record:
+        """获取姿态信息
+
+        按需生成字典，并在收到新的ATTITUDE包之前重复返回同一字典（调用方不应修改）
+        """
+        msg = self._msg_by_slot[self._slot_by_id[mavlink2.MAVLINK_MSG_ID_ATTITUDE]]
+        if msg is None:
             return None
 
-        msg = record.message
-        return {
-            'roll': msg.roll,
-            'pitch': msg.pitch,
-            'yaw': msg.yaw,
-            'rollspeed': msg.rollspeed,
-            'pitchspeed': msg.pitchspeed,
-            'yawspeed': msg.yawspeed,
-        }
+        attitude = self._attitude_cache
+        if attitude is None or attitude[0] is not msg:
+            attitude = self._attitude_cache = (msg, {
+                'roll': msg.roll,
+                'pitch': msg.pitch,
+                'yaw': msg.yaw,
+                'rollspeed': msg.rollspeed,
+                'pitchspeed': msg.pitchspeed,
+                'yawspeed': msg.yawspeed,
+            })
+        return attitude[1]
 
     def get_state(self) -> AirplaneState:
-        """获取无人机状态"""
-        return self.state
+        """获取无人机状态快照（副本，不随后续收包变化）"""
+        state = self.state
+        is_armed, fly_mode, fly_mode_auto, fly_mode_stable = self._mode_snapshot
+        return dataclasses.replace(
+            state,
+            is_armed=is_armed,
+            fly_mode=fly_mode,
+            fly_mode_auto=fly_mode_auto,
+            fly_mode_stable=fly_mode_stable,
+            gps_position=dataclasses.replace(state.gps_position),
+        )
 
     def get_cached_packet(self, msg_id: int) -> Optional[MavLinkPacketRecord]:
-        """获取缓存的数据包"""
-        return self.cached_packet_record.get(msg_id)
+        """获取缓存的数据包（按需构建记录对象，调用方不应修改返回的记录）"""
+        if not 0 <= msg_id <= self._max_msg_id:
+            return None
+        slot = self._slot_by_id[msg_id]
+        if slot == _NO_SLOT:
+            return None
+        seq = self._seq_by_slot
+        while True:
+            begin = seq[slot]
+            message = self._msg_by_slot[slot]
+            timestamp = self._ts_by_slot[slot]
+            # 序号为偶数且读取前后未变化，说明期间没有写入
+            if not begin & 1 and seq[slot] == begin:
+                break
+            # 与写入冲突：让出GIL，让被切走的收包线程尽快写完，而不是空转到切换间隔结束
+            time.sleep(0)
+        if message is None:
+            return None
+        # 槽位自上次构建后没有新包时复用同一记录对象，轮询读取不再每次分配
+        record = self._record_by_slot[slot]
+        if record is None or record.message is not message or record.timestamp != timestamp:
+            record = MavLinkPacketRecord(
+                timestamp=timestamp,
+                msg_id=msg_id,
+                message=message,
+            )
+            self._record_by_slot[slot] = record
+        return record
+
+    def get_cached_packet_count(self) -> int:
+        """获取已缓存的数据包种类数"""
+        return len(self._msg_by_slot) - self._msg_by_slot.count(None)
 
     # ==================== 控制接口 - 使用协议文档中定义的命令 ====================
 
     def arm(self):
         """解锁无人机 - MAV_CMD_COMPONENT_ARM_DISARM (400)"""
-        logger.info(f"Arming device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Arming device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_COMPONENT_ARM_DISARM,
             param1=1  # 1 = arm
         )
 
     def disarm(self):
         """锁定无人机 - MAV_CMD_COMPONENT_ARM_DISARM """
-        logger.info(f"Disarming device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Disarming device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_COMPONENT_ARM_DISARM,
             param1=0  # 0 = disarm
         )
@@ -728,8 +1213,8 @@ class AirplaneOwl02(IAirplane):
         height_cm = int(altitude)
         # 限制范围: min值0，max值1000cm
         # height_cm = max(0, min(1000, height_cm))
-        logger.info(f"Taking off device {self.target_channel_id} to {height_cm}cm")
-        self._send_command_with_retry(
+        logger.info("Taking off device %s to %scm", self.target_channel_id, height_cm)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_TAKEOFF,
             param1=height_cm,
             wait_for_finish=False,  # 改为非阻塞
@@ -738,8 +1223,8 @@ class AirplaneOwl02(IAirplane):
 
     def land(self):
         """降落 - MAV_CMD_EXT_DRONE_LAND """
-        logger.info(f"Landing device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Landing device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_LAND,
             param1=1,  # 普通降落
             param2=100,  # 降落速度100cm/s
@@ -749,96 +1234,63 @@ class AirplaneOwl02(IAirplane):
 
     def return_to_launch(self):
         """返航 - 使用标准命令"""
-        logger.info(f"Returning to launch for device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Returning to launch for device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_NAV_RETURN_TO_LAUNCH,
             wait_for_finish=False,  # 改为非阻塞
             timeout=20.0
         )
 
-    def up(self, distance: int):
-        """上升指定距离 - MAV_CMD_EXT_DRONE_MOVE
+    def _move(self, direction: int, distance: int):
+        """按方向移动指定距离 - MAV_CMD_EXT_DRONE_MOVE
+        :param direction: 方向码（param1），见 _MOVE_DIRECTIONS
         :param distance: 距离，单位cm
         """
         # distance = max(0, min(1000, distance))  # 限制范围
-        logger.info(f"Moving up device {self.target_channel_id} by {distance}cm")
-        self._send_command_with_retry(
+        logger.info("Moving %s device %s by %scm", _MOVE_DIRECTIONS[direction], self.target_channel_id, distance)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_MOVE,
-            param1=1,
+            param1=direction,
             param2=distance,
             param3=100,  # 默认速度100cm/s
             wait_for_finish=False  # 改为非阻塞
         )
 
+    def up(self, distance: int):
+        """上升指定距离 - MAV_CMD_EXT_DRONE_MOVE
+        :param distance: 距离，单位cm
+        """
+        return self._move(_MOVE_UP, distance)
+
     def down(self, distance: int):
         """下降指定距离 - MAV_CMD_EXT_DRONE_MOVE
         :param distance: 距离，单位cm
         """
-        # distance = max(0, min(1000, distance))
-        logger.info(f"Moving down device {self.target_channel_id} by {distance}cm")
-        self._send_command_with_retry(
-            command=mavlink2.MAV_CMD_EXT_DRONE_MOVE,
-            param1=2,
-            param2=distance,
-            param3=100,
-            wait_for_finish=False
-        )
+        return self._move(_MOVE_DOWN, distance)
 
     def forward(self, distance: int):
         """前进指定距离 - MAV_CMD_EXT_DRONE_MOVE
         :param distance: 距离，单位cm
         """
-        # distance = max(0, min(1000, distance))
-        logger.info(f"Moving forward device {self.target_channel_id} by {distance}cm")
-        self._send_command_with_retry(
-            command=mavlink2.MAV_CMD_EXT_DRONE_MOVE,
-            param1=3,
-            param2=distance,
-            param3=100,
-            wait_for_finish=False
-        )
+        return self._move(_MOVE_FORWARD, distance)
 
     def back(self, distance: int):
         """后退指定距离 - MAV_CMD_EXT_DRONE_MOVE
         :param distance: 距离，单位cm
         """
-        # distance = max(0, min(1000, distance))
-        logger.info(f"Moving back device {self.target_channel_id} by {distance}cm")
-        self._send_command_with_retry(
-            command=mavlink2.MAV_CMD_EXT_DRONE_MOVE,
-            param1=4,
-            param2=distance,
-            param3=100,
-            wait_for_finish=False
-        )
+        return self._move(_MOVE_BACK, distance)
 
     def left(self, distance: int):
         """左移指定距离 - MAV_CMD_EXT_DRONE_MOVE
         :param distance: 距离，单位cm
         """
-        # distance = max(0, min(1000, distance))
-        logger.info(f"Moving left device {self.target_channel_id} by {distance}cm")
-        self._send_command_with_retry(
-            command=mavlink2.MAV_CMD_EXT_DRONE_MOVE,
-            param1=5,
-            param2=distance,
-            param3=100,
-            wait_for_finish=False
-        )
+        return self._move(_MOVE_LEFT, distance)
 
     def right(self, distance: int):
         """右移指定距离 - MAV_CMD_EXT_DRONE_MOVE
         :param distance: 距离，单位cm
         """
-        # distance = max(0, min(1000, distance))
-        logger.info(f"Moving right device {self.target_channel_id} by {distance}cm")
-        self._send_command_with_retry(
-            command=mavlink2.MAV_CMD_EXT_DRONE_MOVE,
-            param1=6,
-            param2=distance,
-            param3=100,
-            wait_for_finish=False
-        )
+        return self._move(_MOVE_RIGHT, distance)
 
     def goto(self, x: int, y: int, h: int):
         """
@@ -850,8 +1302,8 @@ class AirplaneOwl02(IAirplane):
         # x = max(-1000, min(1000, x))
         # y = max(-1000, min(1000, y))
         # h = max(-200, min(200, h))
-        logger.info(f"Going to waypoint device {self.target_channel_id}: x={x}, y={y}, h={h}")
-        self._send_command_with_retry(
+        logger.info("Going to waypoint device %s: x=%s, y=%s, h=%s", self.target_channel_id, x, y, h)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_GOTO_CMD,
             param1=x,
             param2=y,
@@ -871,10 +1323,10 @@ class AirplaneOwl02(IAirplane):
         """
         # degree = max(0, min(360, degree))
 
-        # degree mod to [0,360]
-        degree = ((degree % 360) + 360) % 360
-        logger.info(f"Rotating CW device {self.target_channel_id} by {degree} degrees")
-        self._send_command_with_retry(
+        # degree mod to [0,360)（Python 的 % 对正模数总返回非负值）
+        degree = degree % 360
+        logger.info("Rotating CW device %s by %s degrees", self.target_channel_id, degree)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_CIRCLE,
             param1=2,  # 顺时针
             param2=degree,
@@ -887,9 +1339,9 @@ class AirplaneOwl02(IAirplane):
         :param degree: 角度（单位度，min值0，max值360）
         """
         # degree = max(0, min(360, degree))
-        degree = ((degree % 360) + 360) % 360
-        logger.info(f"Rotating CCW device {self.target_channel_id} by {degree} degrees")
-        self._send_command_with_retry(
+        degree = degree % 360
+        logger.info("Rotating CCW device %s by %s degrees", self.target_channel_id, degree)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_CIRCLE,
             param1=1,  # 逆时针
             param2=degree,
@@ -901,10 +1353,10 @@ class AirplaneOwl02(IAirplane):
         设置飞行速度 - MAV_CMD_EXT_DRONE_CHANGE_SPEED
         :param speed: 速度，单位cm/s（min值0，max值200）
         """
-        speed = max(0, min(200, speed))
-        logger.info(f"Setting speed for device {self.target_channel_id} to {speed}cm/s")
+        speed = _clamp(speed, 0, 200)
+        logger.info("Setting speed for device %s to %scm/s", self.target_channel_id, speed)
         # param1: 飞行速度（单位cm/s）
-        self._send_command_with_retry(
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_CHANGE_SPEED,
             param1=speed,
             wait_for_finish=False,
@@ -914,8 +1366,8 @@ class AirplaneOwl02(IAirplane):
         """移动到指定高度处 - MAV_CMD_EXT_DRONE_SET_HEGHT
         :param high: 高度，单位cm
         """
-        logger.info(f"Setting height for device {self.target_channel_id} to {high}cm")
-        self._send_command_with_retry(
+        logger.info("Setting height for device %s to %scm", self.target_channel_id, high)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_SET_HEGHT,
             param1=high,
             wait_for_finish=False,
@@ -928,13 +1380,13 @@ class AirplaneOwl02(IAirplane):
         :param g: 绿色值（0-255）
         :param b: 蓝色值（0-255）
         """
-        r = max(0, min(255, r))
-        g = max(0, min(255, g))
-        b = max(0, min(255, b))
-        logger.info(f"Setting LED color for device {self.target_channel_id} to RGB({r}, {g}, {b})")
+        r = _clamp(r, 0, 255)
+        g = _clamp(g, 0, 255)
+        b = _clamp(b, 0, 255)
+        logger.info("Setting LED color for device %s to RGB(%s, %s, %s)", self.target_channel_id, r, g, b)
         # param1: R, param2: G, param3: B
         # param4: 呼吸灯模式, param5: 彩虹灯模式
-        self._send_command_with_retry(
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_LIGHT_RGB,
             param1=r,
             param2=g,
@@ -951,11 +1403,11 @@ class AirplaneOwl02(IAirplane):
         :param g: 绿色值（0-255）
         :param b: 蓝色值（0-255）
         """
-        r = max(0, min(255, r))
-        g = max(0, min(255, g))
-        b = max(0, min(255, b))
-        logger.info(f"Setting LED breathing mode for device {self.target_channel_id} to RGB({r}, {g}, {b})")
-        self._send_command_with_retry(
+        r = _clamp(r, 0, 255)
+        g = _clamp(g, 0, 255)
+        b = _clamp(b, 0, 255)
+        logger.info("Setting LED breathing mode for device %s to RGB(%s, %s, %s)", self.target_channel_id, r, g, b)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_LIGHT_RGB,
             param1=r,
             param2=g,
@@ -972,11 +1424,11 @@ class AirplaneOwl02(IAirplane):
         :param g: 绿色值（0-255）
         :param b: 蓝色值（0-255）
         """
-        r = max(0, min(255, r))
-        g = max(0, min(255, g))
-        b = max(0, min(255, b))
-        logger.info(f"Setting LED rainbow mode for device {self.target_channel_id} to RGB({r}, {g}, {b})")
-        self._send_command_with_retry(
+        r = _clamp(r, 0, 255)
+        g = _clamp(g, 0, 255)
+        b = _clamp(b, 0, 255)
+        logger.info("Setting LED rainbow mode for device %s to RGB(%s, %s, %s)", self.target_channel_id, r, g, b)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_LIGHT_RGB,
             param1=r,
             param2=g,
@@ -991,10 +1443,10 @@ class AirplaneOwl02(IAirplane):
         设置无人机飞行模式 - MAV_CMD_EXT_DRONE_SET_MODE
         :param mode: 1常规 2巡线 3跟随（通常情况下使用模式1）
         """
-        mode = max(1, min(3, mode))
-        logger.info(f"Setting airplane mode for device {self.target_channel_id} to {mode}")
+        mode = _clamp(mode, 1, 3)
+        logger.info("Setting airplane mode for device %s to %s", self.target_channel_id, mode)
         # param1: mode（1常规 2巡线 3跟随）
-        self._send_command_with_retry(
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_SET_MODE,
             param1=mode
         )
@@ -1009,9 +1461,10 @@ class AirplaneOwl02(IAirplane):
         :param b_min: 色块B通道的最低检测值
         :param b_max: 色块B通道的最高检测值
         """
-        logger.info(f"Setting color detect mode for device {self.target_channel_id}: "
-                    f"L({l_min}-{l_max}), A({a_min}-{a_max}), B({b_min}-{b_max})")
-        self._send_command_with_retry(
+        logger.info(
+            "Setting color detect mode for device %s: L(%s-%s), A(%s-%s), B(%s-%s)",
+            self.target_channel_id, l_min, l_max, a_min, a_max, b_min, b_max)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_VISION_DETECT_MODE_SET,
             param1=l_min,
             param2=l_max,
@@ -1024,8 +1477,8 @@ class AirplaneOwl02(IAirplane):
 
     def stop(self):
         """停桨 - 紧急停止"""
-        logger.warning(f"Emergency stop for device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.warning("Emergency stop for device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_COMPONENT_ARM_DISARM,
             param1=0,  # disarm
             param2=21196  # 紧急停止魔术数字
@@ -1033,8 +1486,8 @@ class AirplaneOwl02(IAirplane):
 
     def hover(self):
         """悬停 - 通过停止当前移动命令实现"""
-        logger.info(f"Hovering device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Hovering device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_HOVER,
             param1=1,
             wait_for_finish=False
@@ -1042,8 +1495,8 @@ class AirplaneOwl02(IAirplane):
 
     def flip_forward(self):
         """前翻 - 使用自定义命令"""
-        logger.info(f"Flip forward for device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Flip forward for device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_EXTRA_ACTIONS,
             param1=1,
             param2=1,
@@ -1052,8 +1505,8 @@ class AirplaneOwl02(IAirplane):
 
     def flip_back(self):
         """后翻 - 使用自定义命令"""
-        logger.info(f"Flip back for device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Flip back for device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_EXTRA_ACTIONS,
             param1=1,
             param2=2,
@@ -1062,8 +1515,8 @@ class AirplaneOwl02(IAirplane):
 
     def flip_left(self):
         """左翻 - 使用自定义命令"""
-        logger.info(f"Flip left for device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Flip left for device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_EXTRA_ACTIONS,
             param1=1,
             param2=3,
@@ -1072,8 +1525,8 @@ class AirplaneOwl02(IAirplane):
 
     def flip_right(self):
         """右翻 - 使用自定义命令"""
-        logger.info(f"Flip right for device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Flip right for device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_EXTRA_ACTIONS,
             param1=1,
             param2=4,
@@ -1082,8 +1535,8 @@ class AirplaneOwl02(IAirplane):
 
     def emergency_stop(self):
         """紧急停机闭锁 - MAV_CMD_EXT_DRONE_URGENT_DISARM """
-        logger.warning(f"Emergency stop for device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.warning("Emergency stop for device %s", self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_URGENT_DISARM,
             param1=1  # 1 = disarm
         )
@@ -1092,9 +1545,9 @@ class AirplaneOwl02(IAirplane):
         """设置openmv识别模式 - MAV_CMD_EXT_DRONE_SET_MODE
         :param mode: 模式值 (1常规 2巡线 3跟随)
         """
-        mode = max(1, min(3, mode))
-        logger.info(f"Setting OpenMV mode for device {self.target_channel_id} to {mode}")
-        self._send_command_with_retry(
+        mode = _clamp(mode, 1, 3)
+        logger.info("Setting OpenMV mode for device %s to %s", self.target_channel_id, mode)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_SET_MODE,
             param1=mode
         )
@@ -1107,8 +1560,8 @@ class AirplaneOwl02(IAirplane):
         :param y: y轴移动距离，单位cm
         :param z: z轴移动距离，单位cm
         """
-        logger.info(f"Going OpenMV command {cmd} for device {self.target_channel_id}")
-        self._send_command_with_retry(
+        logger.info("Going OpenMV command %s for device %s", cmd, self.target_channel_id)
+        return self._send_command_with_retry(
             command=mavlink2.MAV_CMD_EXT_DRONE_OPEMMV_CMD,
             param1=cmd,
             param2=x,
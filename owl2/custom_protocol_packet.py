@@ -2,7 +2,6 @@
 数据包封装和解析工具
 包含数据包的封装、解析和发送功能
 """
-import struct
 from .commonACFly import commonACFly_py3 as mavlink2
 
 # 封装包
@@ -50,6 +49,50 @@ PROTOCOL_SETADDR_PAIR_REQUEST = 96  # 配对数据地址请求 (0x60)
 PROTOCOL_SETADDR_PAIR_INFO = 128  # 配对数据地址请求应答 (0x80)
 
 
+def _x25crc_table_entry(byte: int) -> int:
+    """计算CRC-16/MCRF4XX（反射多项式0x8408）查表项"""
+    crc = byte
+    for _ in range(8):
+        crc = (crc >> 1) ^ 0x8408 if crc & 1 else crc >> 1
+    return crc
+
+
+# MavLink帧CRC查表，模块导入时生成一次
+_X25CRC_TABLE = tuple(_x25crc_table_entry(i) for i in range(256))
+
+
+def _x25crc_accumulate(self, buf):
+    """按字节查表累加CRC，与逐位计算结果一致"""
+    crc = self.crc
+    table = _X25CRC_TABLE
+    for b in buf:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+    self.crc = crc
+
+
+# 方言中原有的逐位实现，install_fast_crc 替换时保存下来（用于对照测试）
+_x25crc_accumulate_bitwise = None
+
+
+def install_fast_crc():
+    """把方言 x25crc 的逐位CRC累加替换为查表实现（重复调用无副作用）
+
+    生成的方言代码（DO NOT EDIT）逐位计算CRC，每个MavLink包收发都会调用。
+    本模块导入时不做替换，由 owl2 包的 __init__ 显式调用一次。
+    """
+    global _x25crc_accumulate_bitwise
+    current = mavlink2.x25crc.accumulate
+    if current is _x25crc_accumulate:
+        return
+    _x25crc_accumulate_bitwise = current
+    mavlink2.x25crc.accumulate = _x25crc_accumulate
+
+
+def calculate_checksum(data: bytes) -> int:
+    """计算校验和（对所有字节求和取低8位）"""
+    # sum() 在C层遍历bytes，无需逐字节的Python循环
+    return sum(data) & 0xFF
+
 
 def wrap_packet(device_id: int, data: bytes, protocol_mode: int = PROTOCOL_COMMAND_MSG) -> bytes:
     """
@@ -79,13 +122,10 @@ def wrap_packet(device_id: int, data: bytes, protocol_mode: int = PROTOCOL_COMMA
     id_field = protocol_mode + device_id
 
     # 构建包体（不包括校验和和帧尾）
-    packet_body = struct.pack('BBB', HEADER1, HEADER2, id_field) + struct.pack('B', data_length) + data
-
-    # 计算校验和（对包体所有字节求和）
-    checksum = sum(packet_body) & 0xFF
+    packet_body = bytes((HEADER1, HEADER2, id_field, data_length)) + data
 
     # 完整数据包
-    packet = packet_body + struct.pack('BB', checksum, TAIL)
+    packet = packet_body + bytes((calculate_checksum(packet_body), TAIL))
 
     # print('wrap_packet packet', packet)
 
@@ -209,26 +249,25 @@ class PacketParser:
         if device_id not in self.mavlink_parsers:
             self.mavlink_parsers[device_id] = mavlink2.MAVLink(None)
 
+        parser = self.mavlink_parsers[device_id]
         mavlink_messages = []
 
-        # 逐字节解析payload中的MAVLink数据
-        for byte in payload:
+        # 整段payload一次性送入解析器，再用空输入排空缓冲区中剩余的完整消息，
+        # 避免逐字节创建bytes对象；状态机本身与逐字节解析完全一致
+        data = payload
+        while True:
+            remaining = parser.buf_len() + len(data)
             try:
-                msg = self.mavlink_parsers[device_id].parse_char(bytes([byte]))
-                if msg:
-                    mavlink_messages.append(msg)
-            except Exception as e:
-                # # MAVLink解析错误，继续处理下一个字节
-                # print(f"MAVLink parsing error for device {device_id}: {e}")
-                # import traceback, sys, inspect
-                # traceback.print_exc(file=sys.stdout)
-                # for frame in inspect.stack()[1:]:
-                #     fname = frame.filename
-                #     lineno = frame.lineno
-                #     func = frame.function
-                #     ctx = frame.code_context[0].strip() if frame.code_context else ''
-                #     print(f"    File \"{fname}\", line {lineno}, in {func} -> {ctx}")
-                continue
+                msg = parser.parse_char(data)
+            except Exception:
+                # MAVLink解析错误（前缀/校验失败），解析器已跳过出错数据，继续处理剩余数据
+                msg = None
+            data = b""
+            if msg:
+                mavlink_messages.append(msg)
+            elif parser.buf_len() >= remaining:
+                # 没有进展，说明剩余数据不足以组成完整消息
+                break
 
         return mavlink_messages
 
@@ -285,8 +324,7 @@ class PacketParser:
             raise ValueError(f"Invalid tail: expected {TAIL}, got {tail}")
 
         # 验证校验和
-        packet_body = packet[:4 + data_length]
-        calculated_checksum = sum(packet_body) & 0xFF
+        calculated_checksum = calculate_checksum(packet[:4 + data_length])
         if checksum != calculated_checksum:
             raise ValueError(f"Checksum mismatch: expected {calculated_checksum}, got {checksum}")
 
@@ -297,14 +335,18 @@ class PacketParser:
         }
 
 
-def send_mavlink_packet_by_custom_protocol(serial_port, device_id: int, mav_msg):
-    """发送MavLink数据包"""
+def pack_mavlink_packet_by_custom_protocol(device_id: int, mav_msg) -> bytes:
+    """将MavLink消息序列化并封装为自定义协议帧"""
     # 创建MavLink对象来序列化消息
-    # print('send_mavlink_packet_by_custom_protocol device_id', device_id, mav_msg)
     mav = mavlink2.MAVLink(None)
     mav_bytes = mav_msg.pack(mav)
-    wrapped = wrap_packet(device_id, mav_bytes)
-    serial_port.write(wrapped)
+    return wrap_packet(device_id, mav_bytes)
+
+
+def send_mavlink_packet_by_custom_protocol(serial_port, device_id: int, mav_msg):
+    """发送MavLink数据包"""
+    # print('send_mavlink_packet_by_custom_protocol device_id', device_id, mav_msg)
+    serial_port.write(pack_mavlink_packet_by_custom_protocol(device_id, mav_msg))
     pass
 
 
@@ -119,6 +119,9 @@ setup(
             'pytest>=6.0',
             'pytest-asyncio',
         ],
+        'speedups': [
+            'uvloop; sys_platform != "win32"',
+        ],
     },
     
     # zip_safe
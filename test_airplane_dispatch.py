@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+测试无人机消息分发与命令ACK处理
+不需要串口：用假的管理器代替，直接把解出的MavLink消息交给无人机对象
+"""
+
+import threading
+import time
+
+from owl2.airplane_owl02 import AirplaneOwl02
+from owl2.commonACFly import commonACFly_py3 as mavlink2
+
+
+class FakeManager:
+    """只记录发送次数的假管理器"""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_msg(self, msg, target_channel_id):
+        self.sent += 1
+        return True
+
+    def send_bytes(self, data, block=True):
+        self.sent += 1
+        return True
+
+
+def _last_status(airplane, command):
+    """取某命令最近一次发送的命令状态"""
+    return list(airplane._status_by_cmd[command].values())[-1]
+
+
+def test_batch_skips_unknown_and_parses_ack():
+    """未知消息不能被当作HEARTBEAT解析或缓存，同一批中的ACK仍能完成命令"""
+    airplane = AirplaneOwl02(1, FakeManager())
+    command = mavlink2.MAV_CMD_EXT_DRONE_HOVER
+    key = airplane.send_command_without_retry(command)
+    status = airplane.get_command_status(key)
+
+    unknown = mavlink2.MAVLink_unknown(60000, b'\x01\x02\x03')
+    ack = mavlink2.MAVLink_command_ack_message(command, 1, 0, status.timestamp)
+    airplane.parse_state_from_mavlink_batch([unknown, ack])
+
+    assert airplane.get_cached_packet(mavlink2.MAVLINK_MSG_ID_HEARTBEAT) is None
+    record = airplane.get_cached_packet(mavlink2.MAVLINK_MSG_ID_COMMAND_ACK)
+    assert record is not None and record.message is ack
+    assert airplane.get_command_status(key).is_received
+
+    # 单条解析路径同样跳过未知消息
+    airplane.parse_state_from_mavlink(unknown)
+    assert airplane.get_cached_packet(mavlink2.MAVLINK_MSG_ID_HEARTBEAT) is None
+
+
+def test_retry_future_resolves_on_ack():
+    """带重发的命令收到ACK后Future为True，且不再重发"""
+    manager = FakeManager()
+    airplane = AirplaneOwl02(1, manager)
+    command = mavlink2.MAV_CMD_EXT_DRONE_HOVER
+    future = airplane.send_command_with_retry(command, async_mode=True)
+    status = _last_status(airplane, command)
+
+    ack = mavlink2.MAVLink_command_ack_message(command, 1, 0, status.timestamp)
+    airplane.parse_state_from_mavlink_batch([ack])
+
+    assert future.result(timeout=1.0) is True
+    assert manager.sent == 1
+
+
+def test_retry_future_resolves_on_timeout():
+    """带重发的命令一直没有ACK时，重发次数用尽后Future为False"""
+    manager = FakeManager()
+    airplane = AirplaneOwl02(1, manager)
+    airplane.retry_timeout = 0.05
+    future = airplane.send_command_with_retry(
+        mavlink2.MAV_CMD_EXT_DRONE_HOVER, async_mode=True, max_retries=2)
+
+    assert future.result(timeout=2.0) is False
+    assert manager.sent == 2
+
+
+def test_sync_command_inside_batched_flushes_first_frame():
+    """batched() 中的同步命令在阻塞等待前就发出首帧，收到ACK即返回而不是等重发"""
+    manager = FakeManager()
+    airplane = AirplaneOwl02(1, manager)
+    airplane.retry_timeout = 5.0
+    command = mavlink2.MAV_CMD_EXT_DRONE_HOVER
+
+    def ack_when_sent():
+        deadline = time.monotonic() + 2.0
+        while manager.sent == 0 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        status = _last_status(airplane, command)
+        airplane.parse_state_from_mavlink_batch(
+            [mavlink2.MAVLink_command_ack_message(command, 1, 0, status.timestamp)])
+
+    acker = threading.Thread(target=ack_when_sent, daemon=True)
+    acker.start()
+    start = time.monotonic()
+    with airplane.batched():
+        result = airplane.send_command_with_retry(command, async_mode=False, max_retries=1)
+    acker.join(timeout=2.0)
+
+    assert result is True
+    assert time.monotonic() - start < 1.0
+    assert manager.sent == 1
@@ -157,11 +157,11 @@ def test_airplane_state_management():
         # 测试缓存的数据包
         cached_heartbeat = airplane.get_cached_packet(mavlink2.MAVLINK_MSG_ID_HEARTBEAT)
         if cached_heartbeat:
-            logger.info(f"Cached heartbeat timestamp: {cached_heartbeat.timestamp}")
+            logger.info(f"Cached heartbeat timestamp: {cached_heartbeat.timestamp_dt}")
             
         cached_gps = airplane.get_cached_packet(mavlink2.MAVLINK_MSG_ID_GLOBAL_POSITION_INT)
         if cached_gps:
-            logger.info(f"Cached GPS timestamp: {cached_gps.timestamp}")
+            logger.info(f"Cached GPS timestamp: {cached_gps.timestamp_dt}")
     
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)